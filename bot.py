@@ -11,9 +11,15 @@ import discord
 from discord.ext import commands
 from discord_slash import SlashCommand
 
-from unsigned_bot.utility.files_util import load_json
+from unsigned_bot.dataset import load_unsigs, get_layer_arrays
+from unsigned_bot.matching import get_symmetry_index, get_structure_index
+from unsigned_bot.ledger import SalesLedger, CertificateLedger
+from unsigned_bot.sync import load_high_water_marks
+from unsigned_bot.store import load_store
 from unsigned_bot.config import GUILD_NAME
 from unsigned_bot.twitter import create_twitter_api
+from unsigned_bot.http_client import http_client
+from unsigned_bot.render_service import render_service
 from unsigned_bot.log import logger
 
 from dotenv import load_dotenv
@@ -22,13 +28,33 @@ load_dotenv()
 TOKEN = os.getenv('BOT_TOKEN')
 
 
+# === load unsigs data once for all modules ===
+load_unsigs()
+get_layer_arrays()
+get_symmetry_index()
+get_structure_index()
+
 # === initialize bot variables ===
-bot = commands.Bot(command_prefix='!', help_command=None)
-bot.sales = load_json("data/json/sales.json")
+class UnsignedBot(commands.Bot):
+    """Bot which releases shared resources on shutdown"""
+
+    async def close(self):
+        await http_client.close()
+        render_service.shutdown()
+
+        await super().close()
+
+bot = UnsignedBot(command_prefix='!', help_command=None)
+bot.sales_ledger = SalesLedger.load()
+bot.sales = bot.sales_ledger.sales
 bot.sales_updated = None
+bot.sales_marks = load_high_water_marks(bot.sales)
+bot.sales_synced = None
 bot.offers = None
 bot.offers_updated = None
-bot.certs = load_json("data/json/certificates.json")
+bot.certs_ledger = CertificateLedger.load()
+bot.certs = bot.certs_ledger.certs
+bot.store = load_store(bot.sales_ledger)
 bot.certs_updated = None
 bot.twitter_api = create_twitter_api()
 
@@ -13,9 +13,6 @@ setup(
         "Pillow",
         "python-dateutil",
         "python-dotenv",
-        "ratelimit",
-        "requests",
-        "requests-html",
         "tweepy"
     ]
 )
\ No newline at end of file
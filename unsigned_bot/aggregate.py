@@ -1,6 +1,12 @@
 """
 Module for aggregating data of marketplaces
+
+All marketplaces are fetched concurrently, each with its own deadline.
+Results are merged as they arrive, so a slow marketplace only costs
+its own deadline and data of the others is returned anyway.
 """
+import time
+import asyncio
 from typing import Optional
 
 from unsigned_bot.log import logger
@@ -10,36 +16,76 @@ import unsigned_bot.marketplaces.jpgstore as jpgstore
 from unsigned_bot.constants import POLICY_ID
 
 
-async def aggregate_data_from_marketplaces(sold: Optional[bool] = False) -> list:
-    """Fetch assets data from available marketplaces"""
+# fetching functions of available marketplaces
+MARKETPLACES = {
+    "cnft": lambda sold, since: cnft.fetch_data_from_marketplace("unsigned_algorithms", sold, since),
+    "tokhun": lambda sold, since: tokhun.get_data_from_marketplace(POLICY_ID, sold, since),
+    "jpgstore": lambda sold, since: jpgstore.get_data_from_marketplace(POLICY_ID, sold, since)
+}
 
-    data = list()
+# max. time for fetching all data of a marketplace [in sec]
+DEADLINES = {
+    "cnft": 300,
+    "tokhun": 300,
+    "jpgstore": 120
+}
 
-    # === cnft.io ==
-    try:
-        assets_cnft = await cnft.fetch_data_from_marketplace("unsigned_algorithms", sold)
-    except:
-        logger.warning("Can not fetch data from cnft.io")
-    else:
-        if assets_cnft:
-            data.extend(assets_cnft)
 
-    # === Tokhun.io ===
-    try:
-        assets_tokhun = await tokhun.get_data_from_marketplace(POLICY_ID, sold)
-    except:
-        logger.warning(f"Can not fetch data from tokhun.io")
-    else:
-        if assets_tokhun:
-            data.extend(assets_tokhun)
-    
-    # === jpg.store ===
+async def fetch_from_marketplace(marketplace: str, sold: bool, since: Optional[dict] = None) -> tuple:
+    """
+    Fetch assets data from given marketplace within its deadline.
+    If high-water mark 'since' is given, fetch only newer sales.
+    Return marketplace, assets and status of fetching.
+    """
+
+    start = time.monotonic()
+    assets = None
+
     try:
-        assets_jpg = await jpgstore.get_data_from_marketplace(POLICY_ID, sold)
+        assets = await asyncio.wait_for(MARKETPLACES[marketplace](sold, since), timeout=DEADLINES[marketplace])
+    except asyncio.TimeoutError:
+        state = "timeout"
+        logger.warning(f"Fetching data from {marketplace} exceeded deadline of {DEADLINES[marketplace]} sec")
     except:
-        logger.warning(f"Can not fetch data from jpg.store")
+        state = "failed"
+        logger.warning(f"Can not fetch data from {marketplace}")
     else:
-        if assets_jpg:
-            data.extend(assets_jpg)
+        # marketplace modules return None if fetching failed
+        state = "ok" if assets is not None else "failed"
+
+    status = {
+        "state": state,
+        "assets": len(assets) if assets else 0,
+        "duration": round(time.monotonic() - start, 1)
+    }
+
+    return marketplace, assets, status
+
+async def aggregate_data_from_marketplaces(sold: Optional[bool] = False, since: Optional[dict] = None) -> tuple:
+    """
+    Fetch assets data from available marketplaces concurrently.
+    If high-water marks per marketplace are given, fetch only newer sales.
+    Return merged assets data and status of each marketplace.
+    """
+
+    if since is None:
+        since = dict()
+
+    data = list()
+    status = dict()
+
+    tasks = [fetch_from_marketplace(marketplace, sold, since.get(marketplace)) for marketplace in MARKETPLACES]
+
+    for next_done in asyncio.as_completed(tasks):
+        marketplace, assets, marketplace_status = await next_done
+
+        if assets:
+            data.extend(assets)
+
+        status[marketplace] = marketplace_status
+
+    return data, status
 
-    return data
\ No newline at end of file
+def get_failed_marketplaces(status: dict) -> list:
+    """Return marketplaces which could not be fetched completely"""
+    return [marketplace for marketplace, marketplace_status in status.items() if marketplace_status.get("state") != "ok"]
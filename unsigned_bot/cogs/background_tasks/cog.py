@@ -8,15 +8,13 @@ import discord
 from discord.ext import commands
 from discord.ext.tasks import loop
 
-from unsigned_bot import ROOT_DIR
 from unsigned_bot.log import logger
-from unsigned_bot.utility.files_util import load_json, save_json
-from unsigned_bot.config import INVERVAL_LOOP, SALES_CHANNEL_ID
+from unsigned_bot.config import INVERVAL_LOOP, INTERVAL_FULL_SYNC, SALES_CHANNEL_ID
 from unsigned_bot.cogs.data.embeds import embed_certificate
-from unsigned_bot.aggregate import aggregate_data_from_marketplaces
+from unsigned_bot.aggregate import aggregate_data_from_marketplaces, get_failed_marketplaces
 from unsigned_bot.fetch import get_new_certificates
+from unsigned_bot.sync import update_high_water_marks, save_high_water_marks
 from unsigned_bot.parsing import (
-    filter_new_sales,
     filter_by_time_interval,
     filter_certs_by_time_interval
 )
@@ -74,20 +72,39 @@ class BackgroundTasks(commands.Cog):
         """Loop to repeat tasks after given time interval"""
 
         # === fetch and update sales data; post and tweet new sales ===
+        now = datetime.utcnow()
+
+        # fetch only sales newer than known ones, except for periodic full sync
+        full_sync = not self.bot.sales_synced or (now - self.bot.sales_synced).total_seconds() >= INTERVAL_FULL_SYNC
+        since = None if full_sync else self.bot.sales_marks
+
         try:
-            sales_data = await aggregate_data_from_marketplaces(sold=True)
+            sales_data, sales_status = await aggregate_data_from_marketplaces(sold=True, since=since)
         except:
             logger.warning("Fetching sales data failed")
         else:
+            failed = get_failed_marketplaces(sales_status)
+            if failed:
+                logger.warning(f"Sales data incomplete, failed marketplaces: {', '.join(failed)}")
+
+            if len(failed) < len(sales_status):
+                self.bot.sales_updated = now
+
+                if full_sync and not failed:
+                    self.bot.sales_synced = now
+
+                logger.info(f"Sales updated ({'full' if full_sync else 'incremental'} sync)")
+
             if sales_data:
-                new_sales = filter_new_sales(self.bot.sales, sales_data)
-                self.bot.sales_updated = datetime.utcnow()
+                new_sales, updated_sales = self.bot.sales_ledger.add(sales_data)
+                self.bot.store.add_sales(new_sales + updated_sales)
 
-                logger.info("Sales updated")
+                if updated_sales:
+                    logger.info(f"{len(updated_sales)} known sales updated")
 
                 if new_sales:
-                    self.bot.sales.extend(new_sales)
-                    save_json(f"{ROOT_DIR}/data/json/sales.json", self.bot.sales)
+                    update_high_water_marks(self.bot.sales_marks, new_sales)
+                    save_high_water_marks(self.bot.sales_marks)
             
                     new_sales = filter_by_time_interval(new_sales, INVERVAL_LOOP * 1000)
 
@@ -105,25 +122,28 @@ class BackgroundTasks(commands.Cog):
 
         # === fetch and update offers data ===
         try:
-            offers_data = await aggregate_data_from_marketplaces(sold=False)
+            offers_data, offers_status = await aggregate_data_from_marketplaces(sold=False)
         except:
             logger.warning("Fetching offers data failed")
         else:
+            failed = get_failed_marketplaces(offers_status)
+            if failed:
+                logger.warning(f"Offers data incomplete, failed marketplaces: {', '.join(failed)}")
+
             if offers_data:
                 self.bot.offers = offers_data
+                self.bot.store.set_offers(offers_data)
                 self.bot.offers_updated = datetime.utcnow()
 
                 logger.info("Offers updated")
 
          # === fetch, update and post new certificates ===
         try:
-            certificates = load_json(f"{ROOT_DIR}/data/json/certificates.json")
-            new_certificates = get_new_certificates(certificates)
+            new_certificates = await get_new_certificates(self.bot.certs)
+            new_certificates = self.bot.certs_ledger.add(new_certificates)
             logger.info(f"{len(new_certificates)} new certificates found")
             
             if new_certificates:
-                self.bot.certs.update(new_certificates)
-                save_json(f"{ROOT_DIR}/data/json/certificates.json", self.bot.certs)
 
                 if self.bot.guild.name == "unsigned_algorithms":
                     num_certificates = len(self.bot.certs.keys())
@@ -8,14 +8,12 @@ from discord.ext import commands
 from discord_slash import cog_ext, SlashContext
 from discord_slash.utils.manage_commands import create_choice, create_option
 
-from unsigned_bot import IMAGE_PATH
 from unsigned_bot.constants import MAX_AMOUNT
 from unsigned_bot.config import GUILD_IDS
 from unsigned_bot.log import logger
 from unsigned_bot.emojis import *
 from unsigned_bot.draw import (
-    gen_grid,
-    delete_image_files
+    gen_grid
 )
 from unsigned_bot.matching import get_similar_unsigs
 from unsigned_bot.parsing import get_numbers_from_string
@@ -70,11 +68,9 @@ class CollectionCog(commands.Cog, name="Collection"):
             return
 
         try:
-            image_path = await gen_grid(selected_numbers, cols=2)
-            image_file = discord.File(image_path, filename="siblings.png")
+            image_buffer = await gen_grid(selected_numbers, cols=2)
+            image_file = discord.File(image_buffer, filename="siblings.png")
             embed.set_image(url="attachment://siblings.png")
-
-            delete_image_files(IMAGE_PATH)
         except:
             await ctx.send(content=f"I can't generate the siblings of your unsig.")
             return
@@ -137,11 +133,9 @@ class CollectionCog(commands.Cog, name="Collection"):
         embed = embed_collection_grid(numbers_cleaned)
 
         try:
-            image_path = await gen_grid(numbers_cleaned, columns)
-            image_file = discord.File(image_path, filename="collection.png")
+            image_buffer = await gen_grid(numbers_cleaned, columns)
+            image_file = discord.File(image_buffer, filename="collection.png")
             embed.set_image(url="attachment://collection.png")
-
-            delete_image_files(IMAGE_PATH)
         except:
             await ctx.send(content=f"I can't generate the collection of your unsigs.")
             return
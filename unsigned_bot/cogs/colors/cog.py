@@ -7,12 +7,11 @@ from discord.ext import commands
 from discord_slash import cog_ext, SlashContext
 from discord_slash.utils.manage_commands import create_choice, create_option
 
-from unsigned_bot import IMAGE_PATH
 from unsigned_bot.config import GUILD_IDS
 from unsigned_bot.log import logger
 from unsigned_bot.emojis import *
 from unsigned_bot.colors import get_color_frequencies
-from unsigned_bot.draw import gen_color_histogram, delete_image_files
+from unsigned_bot.draw import gen_color_histogram
 from unsigned_bot.cogs.checks import valid_channel, valid_unsig
 from .embeds import embed_color_ranking, embed_output_colors
 
@@ -77,11 +76,9 @@ class ColorCog(commands.Cog, name="Color"):
         embed.set_footer(text=f"\nDiscord Bot by Mar5man")
 
         try:
-            image_path = await gen_color_histogram(number, color_frequencies)
-            image_file = discord.File(image_path, filename="histogram.png")
+            image_buffer = await gen_color_histogram(number, color_frequencies)
+            image_file = discord.File(image_buffer, filename="histogram.png")
             embed.set_image(url="attachment://histogram.png")
-                
-            delete_image_files(IMAGE_PATH)
         except:
             await ctx.send(content=f"I can't generate color histogram of your unsig.")
             return
@@ -7,8 +7,6 @@ from discord.ext import commands
 from discord_slash import cog_ext, SlashContext
 from discord_slash.utils.manage_commands import create_choice, create_option
 
-from unsigned_bot import ROOT_DIR, IMAGE_PATH
-from unsigned_bot.utility.files_util import load_json
 from unsigned_bot.config import GUILD_IDS
 from unsigned_bot.constants import MAX_AMOUNT
 from unsigned_bot.urls import POOL_PM_URL
@@ -18,7 +16,8 @@ from unsigned_bot.colors import get_color_frequencies
 from unsigned_bot.draw import (
     gen_unsig,
     gen_animation,
-    delete_image_files
+    get_animation_format,
+    get_animation_extension
 )
 from unsigned_bot.fetch import (
     get_metadata_from_asset_name,
@@ -29,8 +28,7 @@ from unsigned_bot.fetch import (
 from unsigned_bot.parsing import (
     get_idx_from_asset_name,
     get_asset_name_from_idx,
-    get_asset_name_from_minting_order,
-    get_certificate_data_by_number
+    get_asset_name_from_minting_order
 )
 from unsigned_bot.cogs.checks import valid_channel, valid_unsig
 from unsigned_bot.embedding import add_last_update
@@ -77,10 +75,30 @@ class DataCog(commands.Cog, name="Data"):
                         value="blend"
                     )
                 ]
+            ),
+            create_option(
+                name="format",
+                description="file format of animation",
+                required=False,
+                option_type=3,
+                choices=[
+                    create_choice(
+                        name="GIF",
+                        value="gif"
+                    ),
+                    create_choice(
+                        name="WebP",
+                        value="webp"
+                    ),
+                    create_choice(
+                        name="APNG",
+                        value="apng"
+                    )
+                ]
             )
         ]
     )
-    async def _unsig(self, ctx: SlashContext, number: str, animation: bool = False):
+    async def _unsig(self, ctx: SlashContext, number: str, animation: bool = False, format: str = None):
         """show info about your unsig"""   
         
         if not await valid_channel(ctx):
@@ -96,7 +114,8 @@ class DataCog(commands.Cog, name="Data"):
         unsigs_data = get_unsig_data(number)
         minting_data = get_minting_data(number)
 
-        embed = embed_basic_info(number, asset_name, unsigs_data, minting_data, self.bot.sales)
+        sales = self.bot.store.get_sales_by_numbers([number])
+        embed = embed_basic_info(number, asset_name, unsigs_data, minting_data, sales)
 
         color_frequencies = get_color_frequencies(number)
         add_output_colors(embed, color_frequencies, num_colors=6)
@@ -107,11 +126,12 @@ class DataCog(commands.Cog, name="Data"):
         num_props = unsigs_data.get("num_props")
         if animation and num_props > 1:
             try:
-                image_path = await gen_animation(number, mode=animation, backwards=True)
-                image_file = discord.File(image_path, filename="image.gif")
-                embed.set_image(url="attachment://image.gif")
+                animation_format = get_animation_format(format)
+                extension = get_animation_extension(animation_format)
 
-                delete_image_files(IMAGE_PATH, suffix="gif")
+                image_buffer = await gen_animation(number, mode=animation, backwards=True, format=animation_format)
+                image_file = discord.File(image_buffer, filename=f"image.{extension}")
+                embed.set_image(url=f"attachment://image.{extension}")
             except:
                 logger.warning("Animation failed")
             else:
@@ -120,11 +140,9 @@ class DataCog(commands.Cog, name="Data"):
         
         # load image if animations fails
         try: 
-            image_path = await gen_unsig(number, dim=1024)
-            image_file = discord.File(image_path, filename="image.png")
+            image_buffer = await gen_unsig(number, dim=1024)
+            image_file = discord.File(image_buffer, filename="image.png")
             embed.set_image(url="attachment://image.png")
-
-            delete_image_files(IMAGE_PATH, suffix="png")
         except:
             try:
                 image_url = await get_ipfs_url_from_file(asset_name)
@@ -166,16 +184,15 @@ class DataCog(commands.Cog, name="Data"):
             unsigs_data = get_unsig_data(number)
             minting_data = get_minting_data(number)
 
-            embed = embed_basic_info(number, asset_name, unsigs_data, minting_data, self.bot.sales)
+            sales = self.bot.store.get_sales_by_numbers([number])
+            embed = embed_basic_info(number, asset_name, unsigs_data, minting_data, sales)
 
             embed.set_footer(text=f"\nDiscord Bot by Mar5man")
 
             try:
-                image_path = await gen_unsig(number, dim=1024)
-                image_file = discord.File(image_path, filename="image.png")
+                image_buffer = await gen_unsig(number, dim=1024)
+                image_file = discord.File(image_buffer, filename="image.png")
                 embed.set_image(url="attachment://image.png")
-
-                delete_image_files(IMAGE_PATH, suffix="png")
             except:
                 try:
                     image_url = await get_ipfs_url_from_file(asset_name)
@@ -212,7 +229,7 @@ class DataCog(commands.Cog, name="Data"):
 
         asset_name = get_asset_name_from_idx(number)
         try:
-            metadata = get_metadata_from_asset_name(asset_name)
+            metadata = await get_metadata_from_asset_name(asset_name)
             embed = await embed_metadata(metadata)
 
             embed.set_footer(text=f"\nData comes from {POOL_PM_URL}")
@@ -246,9 +263,8 @@ class DataCog(commands.Cog, name="Data"):
 
         number = str(int(number))
 
-        certificates = load_json(f"{ROOT_DIR}/data/json/certificates.json")
-        num_certificates = len(certificates)
-        data = get_certificate_data_by_number(number, certificates)
+        num_certificates = len(self.bot.certs_ledger)
+        data = self.bot.certs_ledger.get_by_number(number)
 
         try:
             embed = embed_certificate(number, data, num_certificates)
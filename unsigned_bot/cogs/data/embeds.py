@@ -30,15 +30,13 @@ from unsigned_bot.fetch import get_minting_tx_id
 from unsigned_bot.parsing import (
     get_asset_id,
     get_idx_from_asset_name,
-    get_unsig_url,
-    filter_sales_by_asset,
-    sort_sales_by_date
+    get_unsig_url
 )
 from unsigned_bot.embedding import add_props, add_num_props, add_minting_order
 
 
 def embed_basic_info(number: str, asset_name: str, unsigs_data: dict, minting_data: tuple, sales: list) -> Embed:
-    """Return discord embed for unsig info"""
+    """Return discord embed for unsig info, sales of unsig are ordered latest first"""
 
     unsig_url = get_unsig_url(number)
 
@@ -50,11 +48,7 @@ def embed_basic_info(number: str, asset_name: str, unsigs_data: dict, minting_da
     add_minting_order(embed, minting_data)
 
     if sales:
-        past_sales = filter_sales_by_asset(sales, asset_name)
-        sales_by_date = sort_sales_by_date(past_sales, descending=True)
-
-        if past_sales:
-            add_sales(embed, sales_by_date)
+        add_sales(embed, sales)
 
     add_num_props(embed, unsigs_data)
     add_props(embed, unsigs_data)
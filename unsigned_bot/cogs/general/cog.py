@@ -2,6 +2,8 @@
 Module for general cog
 """
 
+import inspect
+
 import discord
 from discord.ext import commands
 from discord_slash import cog_ext, SlashContext
@@ -91,6 +93,10 @@ class GeneralCog(commands.Cog, name="General"):
 
             embed_func = EMBED_TOPICS.get(topics)
             embed = embed_func()
+
+            # some embeds fetch data first
+            if inspect.isawaitable(embed):
+                embed = await embed
             
             await ctx.send(embed=embed)
 
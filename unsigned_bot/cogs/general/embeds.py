@@ -135,7 +135,7 @@ def embed_v2() -> Embed:
 
     return embed
 
-def embed_treasury() -> Embed:
+async def embed_treasury() -> Embed:
     """Return discord embed for treasury monitoring"""
 
     title = f"{EMOJI_MONEYBAG} Treasury {EMOJI_MONEYBAG}"
@@ -148,7 +148,7 @@ def embed_treasury() -> Embed:
     wallet_str = f"view on [pool.pm]({pool_link})\nview on [cardanoscan.io]({cardanoscan_link})"
     embed.add_field(name=f"Wallet", value=wallet_str, inline=False)
 
-    balance = get_wallet_balance(TREASURY_ADDRESS)
+    balance = await get_wallet_balance(TREASURY_ADDRESS)
     embed.add_field(name=f"Current Balance", value=f"`₳{balance/1000000:,.0f}`", inline=False)
 
     return embed
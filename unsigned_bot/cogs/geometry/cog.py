@@ -11,12 +11,12 @@ from discord.ext import commands
 from discord_slash import cog_ext, SlashContext
 from discord_slash.utils.manage_commands import create_choice, create_option
 
-from unsigned_bot import ROOT_DIR, IMAGE_PATH
+from unsigned_bot import ROOT_DIR
 from unsigned_bot.utility.files_util import load_json
 from unsigned_bot.config import GUILD_IDS
 from unsigned_bot.emojis import *
 from unsigned_bot.log import logger
-from unsigned_bot.draw import gen_grid, delete_image_files
+from unsigned_bot.draw import gen_grid
 from unsigned_bot.deconstruct import SUBPATTERN_NAMES, filter_subs_by_names
 from unsigned_bot.cogs.checks import valid_channel
 from .embeds import embed_pattern_combo, embed_forms
@@ -130,11 +130,9 @@ class GeometryCog(commands.Cog, name = "Geometry"):
 
         if to_display:
             try:
-                image_path = await gen_grid(to_display, cols)
-                image_file = discord.File(image_path, filename="grid.png")
+                image_buffer = await gen_grid(to_display, cols)
+                image_file = discord.File(image_buffer, filename="grid.png")
                 embed.set_image(url="attachment://grid.png")
-
-                delete_image_files(IMAGE_PATH)
             except:
                 await ctx.send(content=f"I can't display the selection of unsigs.")
                 return
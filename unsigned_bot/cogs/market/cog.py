@@ -9,17 +9,15 @@ from discord.ext import commands
 from discord_slash import cog_ext, SlashContext
 from discord_slash.utils.manage_commands import create_choice, create_option
 
-from unsigned_bot import IMAGE_PATH, ROOT_DIR
+from unsigned_bot import ROOT_DIR
+from unsigned_bot.constants import MAX_AMOUNT
 from unsigned_bot.config import GUILD_IDS
 from unsigned_bot.log import logger
 from unsigned_bot.emojis import *
-from unsigned_bot.utility.time_util import get_interval_from_period
-from unsigned_bot.utility.files_util import load_json
 from unsigned_bot.draw import (
     gen_unsig,
     gen_grid,
-    gen_grid_with_matches,
-    delete_image_files
+    gen_grid_with_matches
 )
 from unsigned_bot.matching import (
     match_unsig,
@@ -28,19 +26,14 @@ from unsigned_bot.matching import (
     save_matches_to_file,
     delete_files
 )
+from unsigned_bot.matches_index import load_matches
 from unsigned_bot.fetch import (
     get_unsig_data, 
     get_minting_data,
     get_ipfs_url_from_file
 )
-from unsigned_bot.parsing import (
-    get_asset_name_from_idx,
-    get_numbers_from_assets,
-    order_by_num_props,
-    filter_by_time_interval,
-    filter_assets_by_type,
-    sort_sales_by_date
-)
+from unsigned_bot.parsing import get_asset_name_from_idx, order_by_num_props
+from unsigned_bot.utility.time_util import get_interval_from_period, get_timestamp_before
 from unsigned_bot.embedding import add_data_source, add_disclaimer, add_policy
 from unsigned_bot.cogs.checks import valid_channel, valid_unsig
 from .embeds import embed_sales, embed_related, embed_matches, embed_offers, embed_offer
@@ -110,7 +103,7 @@ class MarketCog(commands.Cog, name = "Market"):
                     await ctx.send(content=f"Please enter a valid time period!")
                     return
                 else:
-                    filtered= filter_by_time_interval(self.bot.sales, interval_ms)
+                    filtered = self.bot.store.get_sales(since=get_timestamp_before(interval_ms))
             else: 
                 filtered = self.bot.sales
 
@@ -146,8 +139,7 @@ class MarketCog(commands.Cog, name = "Market"):
             return
 
         if self.bot.sales:
-            sales_numbers = get_numbers_from_assets(self.bot.sales)
-            sales_by_date = sort_sales_by_date(self.bot.sales, descending=True)
+            sales_numbers = self.bot.store.get_sold_numbers()
 
             similar_unsigs = get_similar_unsigs(number, sales_numbers, structural=True)
 
@@ -157,7 +149,9 @@ class MarketCog(commands.Cog, name = "Market"):
             related_numbers = related_numbers[:LIMIT_DISPLAY]
             selected_numbers = [int(number), *related_numbers]
 
-            embed = embed_related(number, related_numbers, selected_numbers, sales_by_date, cols=3)
+            related_sales = self.bot.store.get_sales_by_numbers(related_numbers, limit=10)
+
+            embed = embed_related(number, related_numbers, selected_numbers, related_sales, cols=3)
             add_disclaimer(embed, self.bot.sales_updated)
 
             if not related_numbers:
@@ -165,11 +159,9 @@ class MarketCog(commands.Cog, name = "Market"):
                 return
 
             try:
-                image_path = await gen_grid(selected_numbers, cols=3)
-                image_file = discord.File(image_path, filename="related.png")
+                image_buffer = await gen_grid(selected_numbers, cols=3)
+                image_file = discord.File(image_buffer, filename="related.png")
                 embed.set_image(url="attachment://related.png")
-
-                delete_image_files(IMAGE_PATH)
             except:
                 await ctx.send(content=f"I can't generate the related ones of your unsig.")
                 return
@@ -214,14 +206,17 @@ class MarketCog(commands.Cog, name = "Market"):
             return
 
         if search:
-            all_matches = load_json(f"{ROOT_DIR}/data/json/all_matches.json")
-            matches = all_matches.get(number) 
+            matches = load_matches(number)
+
+            # match with entire collection if index is not available
+            if matches is None:
+                matches = match_unsig(number, range(0, MAX_AMOUNT))
         else:
             if not self.bot.offers:
                 await ctx.send(content=f"Currently no marketplace data available...")
                 return   
 
-            offers_numbers = get_numbers_from_assets(self.bot.offers)
+            offers_numbers = self.bot.store.get_offer_numbers()
             matches = match_unsig(number, offers_numbers)
 
         random_matches = choose_random_matches(number, matches)
@@ -234,11 +229,9 @@ class MarketCog(commands.Cog, name = "Market"):
             embed.set_footer(text=f"\nDiscord Bot by Mar5man")
 
         try:
-            image_path = await gen_grid_with_matches(random_matches)
-            image_file = discord.File(image_path, filename="matches.png")
+            image_buffer = await gen_grid_with_matches(random_matches)
+            image_file = discord.File(image_buffer, filename="matches.png")
             embed.set_image(url="attachment://matches.png")
-
-            delete_image_files(IMAGE_PATH)
         except:
             await ctx.send(content=f"I can't generate the matches of your unsig.")
             return
@@ -265,7 +258,7 @@ class MarketCog(commands.Cog, name = "Market"):
             return
         
         if self.bot.offers:
-            filtered = filter_assets_by_type(self.bot.offers, "listing", "offer", "Buy")
+            filtered = self.bot.store.get_offers("listing", "offer", "Buy")
             ordered_by_props = order_by_num_props(filtered)
 
             embed = embed_offers(ordered_by_props)
@@ -319,11 +312,9 @@ class MarketCog(commands.Cog, name = "Market"):
         embed = await embed_offer(seller, price, asset_name, unsig_data, minting_data)
 
         try:
-            image_path = await gen_unsig(number, dim=1024)
-            image_file = discord.File(image_path, filename="image.png")
+            image_buffer = await gen_unsig(number, dim=1024)
+            image_file = discord.File(image_buffer, filename="image.png")
             embed.set_image(url="attachment://image.png")
-
-            delete_image_files(IMAGE_PATH, suffix="png")
         except:
             try:
                 image_url = await get_ipfs_url_from_file(asset_name)
@@ -53,7 +53,7 @@ class OwnershipCog(commands.Cog, name = "Ownership"):
         asset_name = get_asset_name_from_idx(number)
         asset_id = get_asset_id(asset_name)
 
-        owner_address_data = get_current_owner_address(asset_id)
+        owner_address_data = await get_current_owner_address(asset_id)
         if owner_address_data:
             address = owner_address_data.get("name")
 
@@ -8,7 +8,6 @@ from discord.ext import commands
 from discord_slash import cog_ext, SlashContext
 from discord_slash.utils.manage_commands import create_choice, create_option
 
-from unsigned_bot import IMAGE_PATH
 from unsigned_bot.config import GUILD_IDS
 from unsigned_bot.log import logger
 from unsigned_bot.emojis import *
@@ -19,8 +18,7 @@ from unsigned_bot.deconstruct import (
 )
 from unsigned_bot.draw import (
     gen_evolution,
-    gen_subpattern,
-    delete_image_files
+    gen_subpattern
 )
 from unsigned_bot.fetch import get_unsig_data
 from unsigned_bot.parsing import get_asset_name_from_idx
@@ -77,11 +75,9 @@ class StructureCog(commands.Cog, name = "Structure"):
         try:
             extended = True if extended == "extended" else False
 
-            image_path = await gen_evolution(number, show_single_layers=False, extended=extended)
-            image_file = discord.File(image_path, filename="image.png")
+            image_buffer = await gen_evolution(number, show_single_layers=False, extended=extended)
+            image_file = discord.File(image_buffer, filename="image.png")
             embed.set_image(url="attachment://image.png")
-
-            delete_image_files(IMAGE_PATH)
         except:
             await ctx.send(content=f"I can't generate the composition of your unsig.")
             return
@@ -119,11 +115,9 @@ class StructureCog(commands.Cog, name = "Structure"):
         embed = Embed(title=title, description=description, color=color)
 
         try:
-            image_path = await gen_evolution(number, show_single_layers=True)
-            image_file = discord.File(image_path, filename="image.png")
+            image_buffer = await gen_evolution(number, show_single_layers=True)
+            image_file = discord.File(image_buffer, filename="image.png")
             embed.set_image(url="attachment://image.png")
-
-            delete_image_files(IMAGE_PATH)
         except:
             await ctx.send(content=f"I can't generate the ingredients of your unsig.")
             return
@@ -164,11 +158,9 @@ class StructureCog(commands.Cog, name = "Structure"):
         embed = embed_subs(number, asset_name, layers, subpattern_names)
 
         try:
-            image_path = await gen_subpattern(number)
-            image_file = discord.File(image_path, filename="image.png")
+            image_buffer = await gen_subpattern(number)
+            image_file = discord.File(image_buffer, filename="image.png")
             embed.set_image(url="attachment://image.png")
-
-            delete_image_files(IMAGE_PATH)
         except:
             await ctx.send(content=f"I can't generate the subpattern of your unsig.")
             return
@@ -15,4 +15,28 @@ SALES_CHANNEL_ID = 881188219092357180
 
 GUILD_IDS = [GUILD_ID]
 
-INVERVAL_LOOP = 900 # 15 min
\ No newline at end of file
+INVERVAL_LOOP = 900 # 15 min
+INTERVAL_FULL_SYNC = 86400 # 24 h, refetch complete sales history to catch missed sales
+
+# == rendering ==
+RENDER_PROCESSES = 2
+RENDER_QUEUE_SIZE = 8 # max. jobs waiting for a free process
+RENDER_TIMEOUT = 60 # sec
+FAST_PERSPECTIVE = False # nearest neighbor instead of bicubic sampling for perspective views
+ANIMATION_FORMAT = "gif" # gif, webp or apng
+ANIMATION_MAX_BYTES = 8 * 1024**2 # upload limit of discord
+
+# == http client ==
+HTTP_TIMEOUT = 30 # sec per request
+HTTP_RETRIES = 3
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_CONNECTIONS_PER_HOST = 5
+
+# request budgets per host: (calls, period in sec)
+RATE_LIMITS = {
+    "tokhun.io": (10, 60),
+    "cardano-mainnet.blockfrost.io": (10, 1)
+}
+
+# == certificates ==
+CERT_SYNC_CONCURRENCY = 10 # certificates fetched in parallel
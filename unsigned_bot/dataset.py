@@ -0,0 +1,176 @@
+"""
+Module for the unsigs dataset.
+
+Properties of all unsigs are loaded once per process and kept in memory.
+Every module queries the dataset by unsig number instead of re-reading the file.
+
+Additionally the layers of all unsigs are provided as columnar arrays
+(one row per unsig, one column per layer), which are built once from the
+unsigs data and memory-mapped from a binary cache file.
+
+Modules keeping state derived from the dataset register a callback
+with 'on_reload', which is called whenever the data is reloaded.
+"""
+
+from typing import Optional, NamedTuple
+
+import numpy as np
+
+from unsigned_bot.utility.files_util import load_json, save_array, is_up_to_date
+from unsigned_bot.constants import MAX_AMOUNT
+from unsigned_bot import ROOT_DIR
+
+
+UNSIGS_PATH = f"{ROOT_DIR}/data/json/unsigs.json"
+LAYERS_CACHE_PATH = f"{ROOT_DIR}/data/unsigs_layers.npy"
+
+MAX_LAYERS = 6
+
+# codes of categorical properties in layer arrays (-1 marks unused layer slots)
+COLOR_CODES = ["Red", "Green", "Blue"]
+DISTRIBUTION_CODES = ["Normal", "CDF"]
+NO_LAYER = -1
+
+_unsigs = None
+_layers = None
+
+_reload_callbacks = list()
+
+
+class LayerArrays(NamedTuple):
+    """
+    Columnar layer properties of all unsigs.
+
+    Arrays of properties have shape (MAX_AMOUNT, MAX_LAYERS).
+    Colors and distributions are stored as codes,
+    rotations as multiples of 90 degrees.
+    """
+    num_props: np.ndarray
+    colors: np.ndarray
+    multipliers: np.ndarray
+    rotations: np.ndarray
+    distributions: np.ndarray
+
+
+# all columns are stored in a single record to keep each column contiguous on disk;
+# multipliers come first to keep float32 column aligned
+LAYERS_DTYPE = np.dtype([
+    ("multipliers", np.float32, (MAX_AMOUNT, MAX_LAYERS)),
+    ("colors", np.int8, (MAX_AMOUNT, MAX_LAYERS)),
+    ("rotations", np.int8, (MAX_AMOUNT, MAX_LAYERS)),
+    ("distributions", np.int8, (MAX_AMOUNT, MAX_LAYERS)),
+    ("num_props", np.int8, (MAX_AMOUNT,))
+])
+
+
+def load_unsigs(path: Optional[str] = UNSIGS_PATH) -> dict:
+    """Load unsigs data from file into memory and return data"""
+    global _unsigs, _layers
+
+    _unsigs = load_json(path)
+    _layers = None
+
+    return _unsigs
+
+def reload_unsigs() -> dict:
+    """
+    Reload unsigs data from file, e.g. after the file has been updated.
+    Invalidate all derived state.
+    """
+
+    unsigs = load_unsigs()
+
+    for callback in _reload_callbacks:
+        callback()
+
+    return unsigs
+
+def on_reload(callback):
+    """Register function to invalidate state derived from unsigs data on reload"""
+    _reload_callbacks.append(callback)
+    return callback
+
+def get_unsigs() -> dict:
+    """Return data of all unsigs, loading it on first access"""
+    if _unsigs is None:
+        return load_unsigs()
+
+    return _unsigs
+
+def get_unsig(number) -> dict:
+    """Return data of unsig with given number or None if it does not exist"""
+    unsigs = get_unsigs()
+
+    try:
+        key = str(int(number))
+    except (TypeError, ValueError):
+        return None
+    else:
+        return unsigs.get(key, None)
+
+def build_layer_arrays(unsigs: dict) -> np.ndarray:
+    """Convert properties of given unsigs to columnar layer record"""
+
+    record = np.zeros((), dtype=LAYERS_DTYPE)
+
+    record["colors"] = NO_LAYER
+    record["rotations"] = NO_LAYER
+    record["distributions"] = NO_LAYER
+
+    colors_codes = {color: code for code, color in enumerate(COLOR_CODES)}
+    distributions_codes = {dist: code for code, dist in enumerate(DISTRIBUTION_CODES)}
+
+    for key, unsig_data in unsigs.items():
+        idx = int(key)
+        props = unsig_data.get("properties")
+        num_props = unsig_data.get("num_props")
+
+        record["num_props"][idx] = num_props
+
+        for i in range(num_props):
+            record["colors"][idx, i] = colors_codes[props["colors"][i]]
+            record["multipliers"][idx, i] = props["multipliers"][i]
+            record["rotations"][idx, i] = props["rotations"][i] // 90
+            record["distributions"][idx, i] = distributions_codes[props["distributions"][i]]
+
+    return record
+
+def get_layer_arrays() -> LayerArrays:
+    """
+    Return layer arrays of all unsigs.
+    Build cache file from unsigs data if necessary and memory-map it.
+    """
+    global _layers
+
+    if _layers is not None:
+        return _layers
+
+    if not is_up_to_date([LAYERS_CACHE_PATH], UNSIGS_PATH):
+        record = build_layer_arrays(get_unsigs())
+        save_array(LAYERS_CACHE_PATH, record)
+
+    record = np.load(LAYERS_CACHE_PATH, mmap_mode="r")
+
+    _layers = LayerArrays(
+        num_props=record["num_props"],
+        colors=record["colors"],
+        multipliers=record["multipliers"],
+        rotations=record["rotations"],
+        distributions=record["distributions"]
+    )
+
+    return _layers
+
+def get_layers(number) -> list:
+    """Return layers of unsig with given number in the format of 'get_prop_layers'"""
+    arrays = get_layer_arrays()
+
+    idx = int(number)
+    num_props = arrays.num_props[idx]
+
+    colors = [COLOR_CODES[c] for c in arrays.colors[idx, :num_props]]
+    multipliers = arrays.multipliers[idx, :num_props].tolist()
+    rotations = (arrays.rotations[idx, :num_props].astype(int) * 90).tolist()
+    distributions = [DISTRIBUTION_CODES[d] for d in arrays.distributions[idx, :num_props]]
+
+    return list(zip(colors, multipliers, rotations, distributions))
@@ -5,15 +5,20 @@ Code for 'generating an unsig' was extracted from minting transaction of unsig00
 tx_id = e4a90da18935e73f7fd6ffaa688b35b011a1a8a710b47bdb5d7103a05afc0197
 """
 
-import os
+import io
 import math
 import asyncio
+from functools import lru_cache
 from typing import List, Optional
 
 import numpy as np
-from PIL import Image, ImageOps, ImageDraw
+from PIL import Image, ImageOps, ImageDraw, features
 
-from unsigned_bot.utility.files_util import load_json
+from unsigned_bot.config import FAST_PERSPECTIVE, ANIMATION_FORMAT, ANIMATION_MAX_BYTES
+from unsigned_bot.log import logger
+from unsigned_bot.dataset import get_unsig
+from unsigned_bot.render_cache import render_cache
+from unsigned_bot.render_service import render_service
 from unsigned_bot.deconstruct import order_by_color, get_prop_layers
 from unsigned_bot.colors import (
     TOTAL_PIXELS,
@@ -22,11 +27,26 @@ from unsigned_bot.colors import (
     calc_pixel_percentages,
     get_max_percentage
 )
-from unsigned_bot import ROOT_DIR
 
 
 BORDER = 10
 
+# animation formats with PIL format name and file extension
+ANIMATION_FORMATS = {
+    "gif": ("GIF", "gif"),
+    "webp": ("WEBP", "webp"),
+    "apng": ("PNG", "png")
+}
+
+# step sizes of fading/blending, tried in order until animation fits byte budget
+ANIMATION_STEPS = [16, 32, 64, 128, 256]
+
+# palette of GIF frame is computed from every n-th pixel in both directions
+PALETTE_SUBSAMPLING = 4
+
+# share of byte budget targeted when estimating size of animation with larger step
+ANIMATION_BUDGET_MARGIN = 0.9
+
 # === constants from metadata of unsig00000 ===
 DIM = 512
 DIM_LIST = list(range(DIM))
@@ -36,33 +56,25 @@ STD = DIM/6
 
 
 def load_unsig_data(idx: int) -> dict:
-    unsigs = load_json(f"{ROOT_DIR}/data/json/unsigs.json")
-    return unsigs.get(str(idx))
+    return get_unsig(idx)
 
 def norm(x: list , mean: float, std: float):
     p = (np.pi*std) * np.exp(-0.5*((x-mean)/std)**2)
     return p
 
-def scale_make2d(s: np.ndarray, dim: int) -> np.ndarray:
-    """Duplicate rows with 1D distribution dim times and return 2D array"""
-    scaled = np.interp(s, (s.min(), s.max()), (0, U_RANGE))
-    two_d = np.tile(scaled, (dim, 1))
-    return two_d
-
-# probability and cumulative distribution
-p_1d = np.array(norm(DIM_LIST, MEAN, STD)).astype(np.uint32)
-c_1d = np.cumsum(p_1d)
-
-# 2d arrays of 1d distributions
-p_2d = scale_make2d(p_1d, DIM)
-c_2d = scale_make2d(c_1d, DIM)
+def scale(s: np.ndarray) -> np.ndarray:
+    """Scale 1D distribution to range of unsigned integers"""
+    return np.interp(s, (s.min(), s.max()), (0, U_RANGE))
 
-DISTS = {'Normal': p_2d, 'CDF': c_2d}
 CHANNELS = {'Red': 0, 'Green': 1, 'Blue': 2}
 
 
+@lru_cache(maxsize=None)
 def get_distributions(dim: int) -> dict:
-    """Get 2D probability and cumulative distribution"""
+    """
+    Get 1D probability and cumulative distribution for given dimension.
+    Profiles are computed once per dimension and must not be modified.
+    """
 
     dims = list(range(dim))
     dims_mean = np.mean(dims)
@@ -71,37 +83,75 @@ def get_distributions(dim: int) -> dict:
     p_1d = np.array(norm(dims, dims_mean, std)).astype(np.uint32)
     c_1d = np.cumsum(p_1d)
 
-    p_2d = scale_make2d(p_1d, dim)
-    c_2d = scale_make2d(c_1d, dim)
+    dists = {'Normal': scale(p_1d), 'CDF': scale(c_1d)}
+    for profile in dists.values():
+        profile.flags.writeable = False
 
-    return {'Normal': p_2d, 'CDF': c_2d}
+    return dists
 
-def gen_layer(mult: float, dist: str, rot: int, c: int) -> np.ndarray:
-    """Return 3D array of layer from given properties"""
-    n = np.zeros((DIM, DIM, 3)).astype(np.uint32)
-    n = add_layer(n, mult, dist, rot, c)
-    return n
+def rotate_profile(profile: np.ndarray, rot: int) -> np.ndarray:
+    """
+    Return 1D profile as row or column vector, which broadcasts
+    to the 2D distribution rotated by given degrees
+    """
 
-def add_layer(n: np.ndarray, mult: float, dist: str, rot: int, c: int, dists=DISTS) -> np.ndarray:
-    """Add multiple of rotated 2D distribution to given color channel and return 3D array"""
-    buffer =  mult * np.rot90(dists[dist], k=(rot / 90))
-    n[ :, :, c ] = n[ :, :, c ] + buffer
-    return n
+    k = int(rot // 90) % 4
+
+    if k == 0:
+        return profile[np.newaxis, :]
+    elif k == 1:
+        return profile[::-1, np.newaxis]
+    elif k == 2:
+        return profile[np.newaxis, ::-1]
+    else:
+        return profile[:, np.newaxis]
+
+def gen_layer(mult: float, dist: str, rot: int, dim: Optional[int] = DIM) -> np.ndarray:
+    """Return multiple of rotated distribution as row or column vector"""
+    profile = get_distributions(dim)[dist]
+    return mult * rotate_profile(profile, rot)
+
+def empty_channels() -> list:
+    """Return empty accumulators for all color channels"""
+    return [np.zeros((1, 1), dtype=np.uint32) for _ in CHANNELS]
 
-def image_from_ndarray(n: np.ndarray) -> Image:
-    """Transform values of 3D array to RGB values and convert array to image object"""
-    n = np.interp(n, (0, U_RANGE), (0, 255)).astype(np.uint8)
-    image = Image.fromarray(n)
+def add_layer(acc: np.ndarray, layer: np.ndarray) -> np.ndarray:
+    """
+    Add layer to accumulator of one color channel.
+    Accumulator stays 1D (row or column) as long as all layers share an axis
+    and only becomes 2D when layers of both axes are combined.
+    """
+    layer_sum = acc + layer
+
+    # sums beyond uint32 range wrap around like in the original 3D accumulation,
+    # casting via int64 keeps this independent of the memory layout
+    return layer_sum.astype(np.int64).astype(np.uint32)
 
-    return image
+def channels_to_array(channels: list, dim: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Transform channel accumulators to RGB values and broadcast them to 3D array.
+    Write into given array (e.g. region of a canvas) if provided.
+    """
 
-def gen_image_array(unsig_data: dict, dim: Optional[int] = DIM) -> np.ndarray:
-    """Return 3D array from given unsig properties"""
+    n = np.empty((dim, dim, 3), dtype=np.uint8) if out is None else out
+
+    for c, acc in enumerate(channels):
+        n[ :, :, c ] = np.interp(acc, (0, U_RANGE), (0, 255)).astype(np.uint8)
+
+    return n
+
+def image_from_channels(channels: list, dim: Optional[int] = DIM) -> Image:
+    """Transform channel accumulators to RGB values and convert them to image object"""
+    return Image.fromarray(channels_to_array(channels, dim))
+
+def gen_image_array(unsig_data: dict, dim: Optional[int] = DIM, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Return 3D array from given unsig properties, optionally written into given array"""
 
     props = unsig_data['properties']
-    dists = get_distributions(dim) if dim != DIM else DISTS
 
-    n = np.zeros((dim, dim, 3)).astype(np.uint32)
+    # layers are summed up separately per channel with the same
+    # truncation to uint32 after each layer as the full 3D array
+    channels = empty_channels()
 
     for i in range(unsig_data['num_props']):
         mult = props['multipliers'][i]
@@ -111,16 +161,22 @@ def gen_image_array(unsig_data: dict, dim: Optional[int] = DIM) -> np.ndarray:
 
         c = CHANNELS[col]
 
-        n = add_layer(n, mult, dist, rot, c, dists=dists)
+        channels[c] = add_layer(channels[c], gen_layer(mult, dist, rot, dim))
 
-    n = np.interp(n, (0, U_RANGE), (0, 255)).astype(np.uint8)
+    return channels_to_array(channels, dim, out=out)
 
-    return n    
+def render_tiles(canvas: np.ndarray, numbers: list, positions: list, dim: Optional[int] = DIM) -> np.ndarray:
+    """Render unsigs with given numbers straight into canvas array at given (x, y) positions"""
 
-def generate_image(image_array: np.ndarray) -> Image:
-    """Convert 3D array to image object, add borders and do perspective transformation"""
+    for number, (x, y) in zip(numbers, positions):
+        gen_image_array(get_unsig(number), dim, out=canvas[y:y+dim, x:x+dim])
 
-    image = image_from_ndarray(image_array)
+    return canvas
+
+def generate_image(channels: list) -> Image:
+    """Convert channel accumulators to image object, add borders and do perspective transformation"""
+
+    image = image_from_channels(channels)
     image_with_borders = add_border(image)
     transformed_image = transform_image(image_with_borders)
 
@@ -145,14 +201,13 @@ def calc_coeffs(pa: List[tuple], pb: List[tuple]) -> np.ndarray:
 
     return coeffs
 
-def transform_image(image: Image) -> Image:
+@lru_cache(maxsize=None)
+def get_perspective_coeffs() -> tuple:
     """
-    Perform perspective transformation on given image.
-    Convert Image to RGBA format.
+    Return coefficients of perspective transformation and size of output image.
+    Geometry is fixed, so coefficients are solved only once per process.
     """
 
-    image = image.convert('RGBA')
-
     # fixed coordinates for DIM=512 to get perspective view
     # rotate image 45 deg in x-y-plane and then tilt 60 deg in z-axis 
     new_height = 417
@@ -163,36 +218,111 @@ def transform_image(image: Image) -> Image:
 
     coeffs = calc_coeffs([(0,new_mid_y), (new_width/2,0), (new_width/2,new_height), (new_width,new_mid_y)], [(0,0), (old_width,0), (0,old_height), (old_width,old_height)])
 
-    transformed_image = image.transform((new_width, new_height), Image.PERSPECTIVE, coeffs, Image.BICUBIC)
-    
-    return transformed_image
+    return tuple(coeffs), (new_width, new_height)
+
+@lru_cache(maxsize=None)
+def get_sampling_map() -> tuple:
+    """
+    Return flat indices of transformed pixels inside source image
+    and flat indices of their source pixels (nearest neighbor sampling).
+    """
+
+    coeffs, (new_width, new_height) = get_perspective_coeffs()
+    a, b, c, d, e, f, g, h = coeffs
+
+    old_width = old_height = DIM + 2*BORDER
+
+    # sample at pixel centers like PIL
+    y, x = np.mgrid[0:new_height, 0:new_width] + 0.5
+
+    w = g*x + h*y + 1
+    x_in = np.floor((a*x + b*y + c) / w).astype(np.int64)
+    y_in = np.floor((d*x + e*y + f) / w).astype(np.int64)
+
+    inside = (x_in >= 0) & (x_in < old_width) & (y_in >= 0) & (y_in < old_height)
+
+    target_index = np.flatnonzero(inside)
+    source_index = (y_in * old_width + x_in).ravel()[target_index]
+
+    return target_index, source_index
+
+def transform_image(image: Image, fast: Optional[bool] = FAST_PERSPECTIVE) -> Image:
+    """
+    Perform perspective transformation on given image.
+    Convert Image to RGBA format.
+
+    Use bicubic resampling by default or
+    nearest neighbor sampling from precomputed map (fast=True)
+    """
+
+    image = image.convert('RGBA')
+
+    coeffs, size = get_perspective_coeffs()
+
+    if not fast:
+        return image.transform(size, Image.PERSPECTIVE, coeffs, Image.BICUBIC)
+
+    target_index, source_index = get_sampling_map()
+    width, height = size
+
+    # gather RGBA pixels as single 32 bit words, pixels outside source stay transparent
+    pixels = np.asarray(image).view(np.uint32).reshape(-1)
+    transformed = np.zeros(width * height, dtype=np.uint32)
+    transformed[target_index] = pixels[source_index]
+
+    return Image.fromarray(transformed.view(np.uint8).reshape(height, width, 4))
 
 def add_border(image: Image) -> Image:
     """Add white border to image"""
     with_border = ImageOps.expand(image, border=BORDER, fill="white")
     return with_border
 
-async def gen_unsig(idx: str, dim: int) -> str:
+def encode_image(image: Image, format: Optional[str] = "PNG", **params) -> bytes:
+    """Encode image in given format and return data"""
+    buffer = io.BytesIO()
+    image.save(buffer, format=format, **params)
+    return buffer.getvalue()
+
+async def get_rendered(key: tuple, render, *args) -> bytes:
     """
-    Generate image from unsig with given dimension.
-    Return path to image file.
+    Return encoded image for given cache key.
+    Render image in render service if not cached.
     """
 
+    data = render_cache.get(key)
+    if data is None:
+        data = await render_service.run(render, *args)
+        render_cache.put(key, data)
+
+    return data
+
+def render_unsig(idx: str, dim: int) -> bytes:
+    """Render unsig with given dimension and return PNG data"""
+
     unsig_data = load_unsig_data(idx)
 
     image_array = gen_image_array(unsig_data, dim)
     image = Image.fromarray(image_array)
 
-    path = f'img/unsig{idx}.png'
-    image.save(path)
+    data = encode_image(image)
     image.close()
 
-    return path
+    return data
+
+async def gen_unsig(idx: str, dim: int) -> io.BytesIO:
+    """
+    Generate image from unsig with given dimension.
+    Return buffer with encoded image.
+    """
+
+    data = await get_rendered((int(idx), dim, "plain"), render_unsig, idx, dim)
+
+    return io.BytesIO(data)
 
-async def gen_evolution(idx: str, show_single_layers: Optional[bool] = True, extended: Optional[bool] = False) -> str:
+async def gen_evolution(idx: str, show_single_layers: Optional[bool] = True, extended: Optional[bool] = False) -> io.BytesIO:
     """
     Generate exploded view of layers from unsig with given #. 
-    Return path of image file.
+    Return buffer with encoded image.
 
     Options:
         - generate cumulative composition view (default)
@@ -200,6 +330,17 @@ async def gen_evolution(idx: str, show_single_layers: Optional[bool] = True, ext
         - generate both composition and ingredient view (extended=True)
     """
 
+    view = "ingredients" if show_single_layers else "evolution"
+    if extended:
+        view += "_extended"
+
+    data = await get_rendered((int(idx), DIM, view), render_evolution, idx, show_single_layers, extended)
+
+    return io.BytesIO(data)
+
+def render_evolution(idx: str, show_single_layers: bool, extended: bool) -> bytes:
+    """Render exploded view of layers from unsig and return PNG data"""
+
     PADDING = 150
 
     unsig_data = load_unsig_data(idx)
@@ -214,6 +355,9 @@ async def gen_evolution(idx: str, show_single_layers: Optional[bool] = True, ext
     # === generate image for each layer and add to list ===
     images = list()
 
+    # cumulative channels are updated incrementally, each layer is computed once
+    channels = empty_channels()
+
     for i in range(num_props):
         mult = props['multipliers'][i]
         col = props['colors'][i]
@@ -221,29 +365,26 @@ async def gen_evolution(idx: str, show_single_layers: Optional[bool] = True, ext
         rot = props['rotations'][i]
         c = CHANNELS[col]
 
-        if i == 0:
-            n = gen_layer(mult, dist, rot, c)
-        else:
-            n = add_layer(n, mult, dist, rot, c)
+        layer = gen_layer(mult, dist, rot)
+        channels[c] = add_layer(channels[c], layer)
 
-        # generate new image array for each layer when "ingredient view" selected
-        if show_single_layers:
-            image_array = gen_layer(mult, dist, rot, c)
-        else:
-            image_array = n
+        # generate "ingredient layer" for ingredient and extended view only once
+        if show_single_layers or extended:
+            single_channels = empty_channels()
+            single_channels[c] = add_layer(single_channels[c], layer)
+            image_single = generate_image(single_channels)
 
-        # generate "ingredient layers" for extended view
         if extended:
-            n_ext = gen_layer(mult, dist, rot, c)
-            image_ext = generate_image(n_ext)
-            images.append(image_ext)
+            images.append(image_single)
 
-        image = generate_image(image_array)
-        images.append(image)
+        if show_single_layers:
+            images.append(image_single)
+        else:
+            images.append(generate_image(channels))
 
     # add final unsig to ingredient view (except unsig has only one layer)
     if show_single_layers and num_props > 1:
-        image = generate_image(n)
+        image = generate_image(channels)
         images.append(image)
 
     # === generate exploded view from image list ===
@@ -277,14 +418,10 @@ async def gen_evolution(idx: str, show_single_layers: Optional[bool] = True, ext
             else:
                 x_offset = 3*PADDING + layer_width
 
-        # add layer image to 'evolution' image by using image as mask image
-        mask = Image.new(mode="RGBA", size=evolution.size)
-        mask.paste(image, (x_offset, y_offset))
+        # composite layer image onto its region of 'evolution' image
+        evolution.alpha_composite(image, dest=(x_offset, y_offset))
         image.close()
 
-        evolution = Image.alpha_composite(evolution, mask)
-        mask.close()
-
         # with 'extended option' only offset for every second image (in vertical direction)
         if extended:
             if image_idx % 2 != 0:
@@ -294,18 +431,24 @@ async def gen_evolution(idx: str, show_single_layers: Optional[bool] = True, ext
 
     evolution = evolution.rotate(180)
 
-    path = f'img/evolution_{idx}.png'
-    evolution.save(path)
+    data = encode_image(evolution)
     evolution.close()
 
-    return path
+    return data
 
-async def gen_subpattern(idx: str) -> str:
+async def gen_subpattern(idx: str) -> io.BytesIO:
     """
     Generate exploded view of subpattern from unsig with given #. 
-    Return path of image file.
+    Return buffer with encoded image.
     """
 
+    data = await get_rendered((int(idx), DIM, "subpattern"), render_subpattern, idx)
+
+    return io.BytesIO(data)
+
+def render_subpattern(idx: str) -> bytes:
+    """Render exploded view of subpattern from unsig and return PNG data"""
+
     PADDING = 150
     COLORS = ["Red", "Green", "Blue"]
 
@@ -315,10 +458,10 @@ async def gen_subpattern(idx: str) -> str:
 
     # === generate image for each subpattern and add to list ===
     images = list()
-    n_res = None
+    n_res = empty_channels()
 
     for color in COLORS:
-        n_color = None
+        n_color = empty_channels()
         color_layers = ordered_by_color.get(color)
         num_colors = len(ordered_by_color.keys())
 
@@ -330,15 +473,9 @@ async def gen_subpattern(idx: str) -> str:
             col, mult, rot, dist = layer
             c = CHANNELS[col]
 
-            if n_color is None:
-                n_color = gen_layer(mult, dist, rot, c)
-            else:
-                n_color = add_layer(n_color, mult, dist, rot, c)
-
-            if n_res is None:
-                n_res = gen_layer(mult, dist, rot, c)
-            else:
-                n_res = add_layer(n_res, mult, dist, rot, c)
+            layer = gen_layer(mult, dist, rot)
+            n_color[c] = add_layer(n_color[c], layer)
+            n_res[c] = add_layer(n_res[c], layer)
         else:
             sub_image = generate_image(n_color)
             images.append(sub_image)
@@ -369,31 +506,31 @@ async def gen_subpattern(idx: str) -> str:
 
             subpattern = Image.new(mode="RGBA", size=(total_width, total_height), color="black")
 
-        # add layer image to 'subpattern' image by using image as mask image
-        mask = Image.new(mode="RGBA", size=subpattern.size)
-        mask.paste(image, (x_offset, y_offset))
+        # composite layer image onto its region of 'subpattern' image
+        subpattern.alpha_composite(image, dest=(x_offset, y_offset))
         image.close()
 
-        subpattern = Image.alpha_composite(subpattern, mask)
-        mask.close()
-
         y_offset += shift
     
     subpattern = subpattern.rotate(180)
 
-    path = f'img/subpattern_{idx}.png'
-    subpattern.save(path)
+    data = encode_image(subpattern)
     subpattern.close()
 
-    return path
+    return data
 
-async def gen_grid(unsigs: list, cols: int) -> str:
+async def gen_grid(unsigs: list, cols: int) -> io.BytesIO:
     """
     Generate grid view with #cols from given unsigs. 
-    Return path of image file.
+    Return buffer with encoded image.
     """
 
-    unsigs_data = load_json(f"{ROOT_DIR}/data/json/unsigs.json")
+    data = await render_service.run(render_grid, unsigs, cols)
+
+    return io.BytesIO(data)
+
+def render_grid(unsigs: list, cols: int) -> bytes:
+    """Render grid view with #cols from given unsigs and return PNG data"""
 
     num_unsigs = len(unsigs)
 
@@ -409,48 +546,39 @@ async def gen_grid(unsigs: list, cols: int) -> str:
     image_width = (unsig_width + 2*margin) * cols + 2*padding
     image_height = (unsig_height + 2*margin) * rows + 2*padding
 
-    # initialize grid image
-    grid = Image.new("RGB", (image_width, image_height))
-
-    offset_x = offset_y = padding + margin
+    # tile positions row by row
+    positions = list()
+    for i in range(num_unsigs):
+        row, col = divmod(i, cols)
+        offset_x = padding + margin + col * (2*margin+unsig_width)
+        offset_y = padding + margin + row * (2*margin+unsig_height)
+        positions.append((offset_x, offset_y))
 
-    # generate image for each unsig in list and add to grid
-    unsig_idx = 0
-    for _ in range(rows):
-        for _ in range(cols):
-            data = unsigs_data.get(str(unsigs[unsig_idx]))
-            image_array = gen_image_array(data)
-            image = Image.fromarray(image_array)
+    # render all unsigs into one canvas and encode it once
+    canvas = np.zeros((image_height, image_width, 3), dtype=np.uint8)
+    render_tiles(canvas, unsigs, positions)
 
-            grid.paste(image, (offset_x, offset_y))
-            image.close()
+    grid = Image.fromarray(canvas)
 
-            offset_x += 2*margin+unsig_width
-            unsig_idx += 1
-
-            if unsig_idx == num_unsigs:
-                break 
-        
-        offset_x = padding + margin
-        offset_y += 2*margin+unsig_height
-        
-    unsigs_str = "".join(map(str, unsigs))
-    path = f"img/grid_{unsigs_str}.png"
-
-    grid.save(path)
+    data = encode_image(grid)
     grid.close()
 
-    return path
+    return data
 
-async def gen_grid_with_matches(selected_matches: dict) -> str:
+async def gen_grid_with_matches(selected_matches: dict) -> io.BytesIO:
     """
     Generate grid view for selected unsig matches.
     One matching unsig for each side (top, right, bottom, left).
 
-    Return path of image file.
+    Return buffer with encoded image.
     """
 
-    unsigs_data = load_json(f"{ROOT_DIR}/data/json/unsigs.json")
+    data = await render_service.run(render_grid_with_matches, selected_matches)
+
+    return io.BytesIO(data)
+
+def render_grid_with_matches(selected_matches: dict) -> bytes:
+    """Render grid view for selected unsig matches and return PNG data"""
 
     # set image params
     padding = 50
@@ -480,66 +608,136 @@ async def gen_grid_with_matches(selected_matches: dict) -> str:
         "center": (center_x, center_y)
     }
 
-    # initialize grid image
-    grid = Image.new("RGB", (image_width, image_height))
+    # render all unsigs into one canvas and encode it once
+    canvas = np.zeros((image_height, image_width, 3), dtype=np.uint8)
+    render_tiles(canvas, list(selected_matches.values()), [positions.get(side) for side in selected_matches])
 
-    # generate image for each side in list and add to grid
-    for side, number in selected_matches.items():
-        data = unsigs_data.get(str(int(number)))
-        image_array = gen_image_array(data)
-        image = Image.fromarray(image_array)
+    grid = Image.fromarray(canvas)
 
-        position = positions.get(side)
+    data = encode_image(grid)
+    grid.close()
 
-        grid.paste(image, position)
-        image.close()
+    return data
 
-    unsigs_str = selected_matches.get("center")
-    path = f"img/matches_{unsigs_str}.png"
-    grid.save(path)
-    grid.close()
+class AnimationTooLarge(Exception):
+    """Raised if animation exceeds byte budget even with the largest step"""
 
-    return path
 
 def _v_fade(step: Optional[int] = 16) -> list:
-    """Utility function for fading effect in animation"""
+    """Utility function for fading effect in animation, return alpha of each frame"""
 
-    n = np.zeros((DIM, DIM)).astype(np.uint8)   
+    alphas = list(range(0, 255, step)) + [255]
 
-    result = list()
-
-    for i in range(0, 255, step):
-        n[:][:] = i
-        result.append(Image.fromarray(n.copy()))
-    
-    n[:][:] = 255
-    result.append(Image.fromarray(n.copy()))
-
-    return result
+    return [np.full((1, 1, 1), alpha, dtype=np.uint8) for alpha in alphas]
 
 def _v_blend(width: Optional[int] = 16) -> list:
-    """Utility function for blending effect in animation"""
+    """Utility function for blending effect in animation, return alpha of each row per frame"""
 
-    n = np.zeros((DIM, DIM)).astype(np.uint8)            
-    
-    result=[Image.fromarray(n.copy())]
+    n = np.zeros((DIM, 1, 1)).astype(np.uint8)
+
+    result = [n.copy()]
 
     for i in range(int(n.shape[0]/width)+1):
-        y=i*(width)
-        n[y:y+width][:] = 255
+        y = i*(width)
+        n[y:y+width] = 255
 
-        result.append(Image.fromarray(n.copy()))
+        result.append(n.copy())
 
     return result
 
-async def gen_animation(idx: str, mode: str ="fade", backwards: Optional[bool] = False) -> str:
+def count_frames(num_layers: int, mode: str, step: int, backwards: bool) -> int:
+    """Return number of frames of animation with given step size, like masks of '_v_fade' and '_v_blend'"""
+
+    if mode == "blend":
+        num_masks = DIM // step + 2
+    else:
+        num_masks = len(range(0, 255, step)) + 1
+
+    num_frames = (num_layers - 1) * num_masks
+
+    return 2 * num_frames if backwards else num_frames
+
+def blend_arrays(base: np.ndarray, top: np.ndarray, alpha: np.ndarray) -> np.ndarray:
+    """Blend top over base image array with given alpha (0-255), rounded like PIL"""
+    tmp = base.astype(np.uint16) * (255 - alpha) + top.astype(np.uint16) * alpha + 128
+    return (((tmp >> 8) + tmp) >> 8).astype(np.uint8)
+
+def quantize_frame(frame: np.ndarray) -> Image:
+    """
+    Convert image array to palette image.
+    Palette is computed with median cut like PIL does for GIF frames,
+    but from a subsampled frame, which keeps colors of smooth unsigs at a fraction of the cost.
+    """
+
+    sample = Image.fromarray(np.ascontiguousarray(frame[::PALETTE_SUBSAMPLING, ::PALETTE_SUBSAMPLING]))
+    palette = sample.quantize(colors=256, method=Image.MEDIANCUT)
+    sample.close()
+
+    image = Image.fromarray(frame)
+    quantized = image.quantize(palette=palette, dither=Image.NONE)
+    image.close()
+    palette.close()
+
+    return quantized
+
+def webp_animation_supported() -> bool:
+    """Check if PIL can write animated WebP files"""
+    try:
+        return features.check_feature("webp_anim")
+    except ValueError:
+        # newer PIL versions have no separate feature for animated WebP
+        return features.check_module("webp")
+
+def get_animation_format(format: Optional[str] = None) -> str:
+    """
+    Return given or configured animation format.
+    Fall back to GIF if format is unknown or not supported by PIL.
+    """
+
+    format = (format or ANIMATION_FORMAT).lower()
+
+    if format not in ANIMATION_FORMATS:
+        logger.warning(f"Unknown animation format {format}, fall back to GIF")
+        return "gif"
+
+    if format == "webp" and not webp_animation_supported():
+        logger.warning("Animated WebP not supported, fall back to GIF")
+        return "gif"
+
+    return format
+
+def get_animation_extension(format: str) -> str:
+    """Return file extension of given animation format"""
+    _, extension = ANIMATION_FORMATS.get(format)
+    return extension
+
+async def gen_animation(idx: str, mode: str ="fade", backwards: Optional[bool] = False, format: Optional[str] = None) -> io.BytesIO:
     """
     Generate animation from given unsig. 
-    Return path of image (.gif) file. 
+    Return buffer with encoded animation (.gif, .webp or .png).
 
     Options:
         - animation style (blend or fade)
         - extended animation (backwards=True)
+        - animation format (gif, webp or apng), default from config
+    """
+
+    format = get_animation_format(format)
+
+    view = f"animation_{mode}"
+    if backwards:
+        view += "_backwards"
+    view += f"_{format}"
+
+    data = await get_rendered((int(idx), DIM, view), render_animation, idx, mode, backwards, format)
+
+    return io.BytesIO(data)
+
+def render_animation(idx: str, mode: str, backwards: bool, format: Optional[str] = "gif", max_bytes: Optional[int] = ANIMATION_MAX_BYTES) -> bytes:
+    """
+    Render animation from given unsig and return encoded data.
+    Use larger steps (less frames) until animation fits into given bytes,
+    raise AnimationTooLarge if it does not fit with the largest step.
     """
 
     unsig_data = load_unsig_data(idx)
@@ -547,10 +745,10 @@ async def gen_animation(idx: str, mode: str ="fade", backwards: Optional[bool] =
     props = unsig_data.get("properties")
     num_props = unsig_data.get("num_props")
 
-     # === generate image for each layer and add to list ===
-    images = list()
+    # === generate image array for each layer and add to list ===
+    arrays = list()
 
-    n = None
+    channels = empty_channels()
     for i in range(num_props):
         mult = props['multipliers'][i]
         col = props['colors'][i]
@@ -558,68 +756,89 @@ async def gen_animation(idx: str, mode: str ="fade", backwards: Optional[bool] =
         rot = props['rotations'][i]
         c = CHANNELS[col]
 
-        if n is None:
-            n = gen_layer(mult, dist, rot, c)
-        else:
-            n = add_layer(n, mult, dist, rot, c)
-        
-        new_layer = image_from_ndarray(n)
-        images.append(new_layer)
+        channels[c] = add_layer(channels[c], gen_layer(mult, dist, rot))
+        arrays.append(channels_to_array(channels, DIM))
+
+    step = ANIMATION_STEPS[0]
+
+    while True:
+        data = encode_animation(arrays, mode, step, backwards, format)
+
+        if len(data) <= max_bytes:
+            return data
 
-    # set frame durations dependend on mode
+        larger_steps = [s for s in ANIMATION_STEPS if s > step]
+        if not larger_steps:
+            raise AnimationTooLarge(f"Animation of unsig {idx} exceeds {max_bytes} bytes")
+
+        # estimate size from bytes per frame and jump to first step which fits
+        bytes_per_frame = len(data) / count_frames(num_props, mode, step, backwards)
+        fitting_steps = [s for s in larger_steps if bytes_per_frame * count_frames(num_props, mode, s, backwards) <= max_bytes * ANIMATION_BUDGET_MARGIN]
+
+        step = fitting_steps[0] if fitting_steps else larger_steps[-1]
+
+def encode_animation(arrays: list, mode: str, step: int, backwards: bool, format: str) -> bytes:
+    """Generate frames between given layer image arrays with given step size and return encoded animation"""
+
+    # set frame durations dependend on mode, keep total duration for larger steps
     if mode == "blend":
-        DURATION_FRAME =  50
+        DURATION_FRAME = 50 * step // 16
+        masks = _v_blend(step)
+    else:
+        DURATION_FRAME = 100 * step // 16
+        masks = _v_fade(step)
+
+    if format == "gif":
+        to_image = quantize_frame
     else:
-        DURATION_FRAME = 100
+        to_image = Image.fromarray
 
     # === generate frames for animation ===
-    images_faded = list()
+    frames = list()
     durations = list()
 
-    for i in range(len(images)):
-        if i == 0:
-            continue
-        
-        if mode =="blend":
-            new_frames = [Image.composite(images[i],images[i-1],mask) for mask in _v_blend()]
-        else:
-            new_frames = [Image.composite(images[i],images[i-1],mask) for mask in _v_fade()]
-
-        images_faded.extend(new_frames)
+    for i in range(1, len(arrays)):
+        # frames are converted right away, for GIF only palette images are kept
+        new_frames = [to_image(blend_arrays(arrays[i-1], arrays[i], mask)) for mask in masks]
+        frames.extend(new_frames)
 
         # set durations for animations frames
         duration_frames = [DURATION_FRAME] * len(new_frames)
         duration_frames[-1] = 1000 # show last frame of each unsig layer longer than other frames
         durations.extend(duration_frames)
-    
-    images_faded = images_faded[::-1] # reverse frame order to start with final unsig frame
+
+    frames = frames[::-1] # reverse frame order to start with final unsig frame
 
     durations[0] = 3000
     durations[-1] = 1000
 
-    # extend frames if 'backwards option' selected
+    # extend frames if 'backwards option' selected (same frame objects in reverse order)
     if backwards:
-        fading_backwards = images_faded[::-1]
-        durations_backwards = durations[::-1]
+        frames.extend(frames[::-1])
+        durations.extend(durations[::-1])
 
-        images_faded.extend(fading_backwards)
-        durations.extend(durations_backwards)
-    
     # set start frame of animation
-    base_layer = images[-1]
+    base_layer = to_image(arrays[-1])
 
-    path = f"img/animation_{idx}.gif"
-    base_layer.save(path, format="GIF", append_images=images_faded[1:], save_all=True, duration=durations, loop=0)
+    pil_format, _ = ANIMATION_FORMATS.get(format)
+    data = encode_image(base_layer, format=pil_format, append_images=frames[1:], save_all=True, duration=durations, loop=0)
     base_layer.close()
 
-    return path
+    return data
 
-async def gen_image_for_tweet(idx: str) -> str:
+async def gen_image_for_tweet(idx: str) -> io.BytesIO:
     """
     Generate image from unsig with optimized resolution for twitter embed.
-    Return path to image file.
+    Return buffer with encoded image.
     """
 
+    data = await get_rendered((int(idx), 2048, "tweet"), render_image_for_tweet, idx)
+
+    return io.BytesIO(data)
+
+def render_image_for_tweet(idx: str) -> bytes:
+    """Render unsig on background with twitter resolution and return PNG data"""
+
     unsig_data = load_unsig_data(idx)
 
     background_size = (4096, 2048)
@@ -634,18 +853,24 @@ async def gen_image_for_tweet(idx: str) -> str:
     background.paste(image, (pos_x, pos_y))
     image.close()
 
-    path = f'img/tweet_{idx}.png'
-    background.save(path)
+    data = encode_image(background)
     background.close()
 
-    return path
+    return data
 
-async def gen_color_histogram(idx: str, color_frequencies: dict, sort_colors: Optional[bool] = False) -> str:
+async def gen_color_histogram(idx: str, color_frequencies: dict, sort_colors: Optional[bool] = False) -> io.BytesIO:
     """
     Generate color histogram for unsig according to cumulative pixel amount.
-    Return path to image file.
+    Return buffer with encoded image.
     """
 
+    data = await render_service.run(render_color_histogram, color_frequencies, sort_colors)
+
+    return io.BytesIO(data)
+
+def render_color_histogram(color_frequencies: dict, sort_colors: bool) -> bytes:
+    """Render color histogram according to cumulative pixel amount and return PNG data"""
+
     if sort_colors:
         frequencies_sorted = sorted(color_frequencies.items(), key=lambda x: x[1], reverse=True)
     else:
@@ -696,14 +921,7 @@ async def gen_color_histogram(idx: str, color_frequencies: dict, sort_colors: Op
     if not sort_colors:
         image = image.transpose(Image.ROTATE_90)
 
-    path = f"img/output_colors_{idx}.png"
-    image.save(path)
+    data = encode_image(image)
     image.close()
 
-    return path
-
-def delete_image_files(path: str, suffix: str = "png"):
-    """Delete files in given path with given suffix"""
-    for file in os.scandir(path):
-        if file.name.endswith(f".{suffix}"):
-            os.unlink(file.path)
\ No newline at end of file
+    return data
\ No newline at end of file
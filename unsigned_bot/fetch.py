@@ -4,11 +4,16 @@ Module for fetching data
 
 import os
 import json
+import asyncio
+from collections import OrderedDict
 from typing import Optional
-import requests
-from requests_html import HTMLSession, AsyncHTMLSession
+from lxml import html
 
 from unsigned_bot.utility.files_util import load_json
+from unsigned_bot.http_client import http_client
+from unsigned_bot.config import CERT_SYNC_CONCURRENCY
+from unsigned_bot.log import logger
+from unsigned_bot.dataset import get_unsig
 from unsigned_bot.constants import POLICY_ID, ASSESSMENTS_POLICY_ID
 from unsigned_bot.urls import CARDANOSCAN_URL, BLOCKFROST_IPFS_URL, BLOCKFROST_API_URL, POOL_PM_URL
 from unsigned_bot import ROOT_DIR
@@ -22,56 +27,110 @@ BLOCKFROST_API_HEADERS = {
 }
 BLOCKFROST_API_URL = "https://cardano-mainnet.blockfrost.io/api/v0"
 
+# max. results per page of blockfrost API
+BLOCKFROST_PAGE_SIZE = 100
 
-def get_request(url: str, headers: Optional[dict] = None, params: Optional[dict] = None):
+# transactions and blocks never change, so their data is cached
+CHAIN_CACHE_SIZE = 1024
+chain_cache = OrderedDict()
+
+# scraped pages expect requests from a browser
+HTML_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0 Safari/537.36"
+}
+
+
+async def get_request(url: str, headers: Optional[dict] = None, params: Optional[dict] = None):
     """Return response if request is successful and in JSON format"""
     try:
-        response = requests.get(url, headers=headers, params=params).json()
+        response = await http_client.get_json(url, headers=headers, params=params)
     except:
         return
     else:
         return response
 
+async def get_cached_request(url: str, headers: Optional[dict] = None):
+    """
+    Return response of request from cache, request it only once.
+    Concurrent calls for the same url share one request, failed requests are not cached.
+    """
+
+    task = chain_cache.get(url)
+
+    if task is None:
+        task = asyncio.ensure_future(get_request(url, headers=headers))
+        chain_cache[url] = task
+
+        if len(chain_cache) > CHAIN_CACHE_SIZE:
+            chain_cache.popitem(last=False)
+    else:
+        chain_cache.move_to_end(url)
+
+    response = await task
+
+    if response is None and chain_cache.get(url) is task:
+        del chain_cache[url]
+
+    return response
+
+async def get_html(url: str):
+    """Return parsed HTML document if request is successful"""
+    text = await http_client.get_text(url, headers=HTML_HEADERS)
+    return html.fromstring(text)
+
 
 # === Blockfrost API calls ===
-def get_asset_ids(policy_id: str) -> list:
-    """Return list of asset ids for a given policy"""
+async def get_asset_ids(policy_id: str) -> list:
+    """Return list of all asset ids for a given policy via pagination"""
 
     url = f"{BLOCKFROST_API_URL}/assets/policy/{policy_id}"
     params = {
         "page": 1,
+        "count": BLOCKFROST_PAGE_SIZE,
         "order": "desc"
     }
-    response = get_request(url, headers=BLOCKFROST_API_HEADERS, params=params)
-    
-    if response:
-        return [asset.get("asset") for asset in response]
 
-def get_asset_data(asset_id: str) -> dict:
+    asset_ids = list()
+
+    while True:
+        response = await get_request(url, headers=BLOCKFROST_API_HEADERS, params=params)
+
+        if response is None:
+            return
+
+        asset_ids.extend(asset.get("asset") for asset in response)
+
+        # last page is not full
+        if len(response) < BLOCKFROST_PAGE_SIZE:
+            return asset_ids
+
+        params["page"] += 1
+
+async def get_asset_data(asset_id: str) -> dict:
     """Return data for asset with given asset id"""
     url = f"{BLOCKFROST_API_URL}/assets/{asset_id}"
-    response = get_request(url, headers=BLOCKFROST_API_HEADERS)
+    response = await get_request(url, headers=BLOCKFROST_API_HEADERS)
     return response
 
-def get_tx_data(tx_id: str) -> dict:
+async def get_tx_data(tx_id: str) -> dict:
     "Return data for transaction with given id"
     url = f"{BLOCKFROST_API_URL}/txs/{tx_id}"
-    response = get_request(url, headers=BLOCKFROST_API_HEADERS)
+    response = await get_cached_request(url, headers=BLOCKFROST_API_HEADERS)
     return response
 
-def get_block_data(block_id: str) -> dict:
+async def get_block_data(block_id: str) -> dict:
     "Return data for block with given id"
     url = f"{BLOCKFROST_API_URL}/blocks/{block_id}"
 
-    response = get_request(url, headers=BLOCKFROST_API_HEADERS)
+    response = await get_cached_request(url, headers=BLOCKFROST_API_HEADERS)
     return response
 
-def get_tx_timestamp(tx_id: str) -> int:
+async def get_tx_timestamp(tx_id: str) -> int:
     """Return timestamp of tx [in ms]"""
     try:
-        tx_data = get_tx_data(tx_id)
+        tx_data = await get_tx_data(tx_id)
         block_id = tx_data.get("block")
-        block_data = get_block_data(block_id)
+        block_data = await get_block_data(block_id)
         timestamp = block_data.get("time")
     except:
         return 0
@@ -109,13 +168,12 @@ async def get_minting_tx_id(asset_id: str) -> str:
 
     try:
         URL = f"{CARDANOSCAN_URL}/token/{asset_id}/?tab=minttransactions"
-        asession = AsyncHTMLSession()
-        r = await asession.get(URL)
+        document = await get_html(URL)
     except:
         return
     else:
         try:
-            tx_id = r.html.xpath("//*[@id='minttransactions']//a[starts-with(@href,'/transaction')]/text()")[0]
+            tx_id = document.xpath("//*[@id='minttransactions']//a[starts-with(@href,'/transaction')]/text()")[0]
         except:
             return
         else:
@@ -126,12 +184,11 @@ async def metadata_from_tx_id(tx_id: str) -> dict:
 
     try:
         URL=f"{CARDANOSCAN_URL}/transaction/{tx_id}/?tab=metadata"
-        session = HTMLSession()
-        r = session.get(URL)
+        document = await get_html(URL)
     except:
         return
     else:
-        metadata_str = r.html.xpath("//*[@class='metadata-value']/text()")[0]
+        metadata_str = document.xpath("//*[@class='metadata-value']/text()")[0]
 
         if metadata_str:
             metadata = json.loads(metadata_str)
@@ -148,16 +205,15 @@ def get_ipfs_hash(metadata: dict, asset_name: str) -> str:
         if image_url:   
             return image_url.rsplit("/")[-1]
 
-def get_metadata_from_asset_name(asset_name: str) -> dict:
+async def get_metadata_from_asset_name(asset_name: str) -> dict:
     """Get metadata for given asset"""
     url = f"{POOL_PM_URL}/asset/{POLICY_ID}.{asset_name}"
-    response = get_request(url, headers=None)
+    response = await get_request(url, headers=None)
     return response.get("metadata")
 
 def get_unsig_data(idx: str) -> dict:
-    """Load properties data from file for given unsig"""
-    unsigs_data = load_json(f"{ROOT_DIR}/data/json/unsigs.json")
-    return unsigs_data.get(idx, None)
+    """Get properties data for given unsig"""
+    return get_unsig(idx)
 
 def get_minting_number(asset_name: str) -> int:
     """Load minting order from file for given unsig"""
@@ -176,20 +232,18 @@ def get_minting_data(number: str) -> tuple:
 
     return (int(minting_order), int(minting_time))
 
-def get_current_owner_address(token_id: str) -> str:
+async def get_current_owner_address(token_id: str) -> str:
     """Get current owner address for given token id by scraping HTML"""
 
     try:
         url = f"{CARDANOSCAN_URL}/token/{token_id}?tab=topholders"
-        session = HTMLSession()
-
-        r = session.get(url)
+        document = await get_html(url)
     except:
         address = None
     else:
         try:
-            address_str = r.html.xpath("//*[@id='topholders']//a[contains(@href,'address')]/text()")[0]
-            address_id = r.html.xpath("//*[@id='topholders']//a[contains(@href,'address')]/@href")[0]
+            address_str = document.xpath("//*[@id='topholders']//a[contains(@href,'address')]/text()")[0]
+            address_id = document.xpath("//*[@id='topholders']//a[contains(@href,'address')]/@href")[0]
             address_id = address_id.rsplit("/")[-1]
         except:
             address = None
@@ -201,11 +255,11 @@ def get_current_owner_address(token_id: str) -> str:
     finally:
         return address
 
-def get_wallet_balance(address: str) -> int:
+async def get_wallet_balance(address: str) -> int:
     "Get current balance for wallet with given address"
     try:
         url = f"{POOL_PM_URL}/wallet/{address}"
-        response = get_request(url, headers=None)
+        response = await get_request(url, headers=None)
 
         lovelaces = response.get("lovelaces", 0)
         reward = response.get("reward", 0)
@@ -215,20 +269,35 @@ def get_wallet_balance(address: str) -> int:
     else:
         return lovelaces + reward - withdrawal
 
-def get_new_certificates(certificates: dict) -> dict:
-    """Identify new certificates and fetch data for each certificate"""
+async def get_new_certificates(certificates: dict) -> dict:
+    """Identify new certificates and fetch data of certificates concurrently"""
+
+    asset_ids = await get_asset_ids(ASSESSMENTS_POLICY_ID)
+    new_certs_ids = list(set(asset_ids).difference(certificates.keys()))
 
-    asset_ids = get_asset_ids(ASSESSMENTS_POLICY_ID)
-    new_certs_ids = set(asset_ids).difference(set(certificates.keys()))
+    semaphore = asyncio.Semaphore(CERT_SYNC_CONCURRENCY)
+    tasks = [get_certificate(cert_id, semaphore) for cert_id in new_certs_ids]
+    results = await asyncio.gather(*tasks)
 
-    new_certs = dict()
-    for cert_id in list(new_certs_ids):
-        cert_data = get_asset_data(cert_id)
+    new_certs = {cert_id: cert_data for cert_id, cert_data in zip(new_certs_ids, results) if cert_data}
+
+    # failed certificates are fetched again in next run
+    if len(new_certs) < len(new_certs_ids):
+        logger.warning(f"Can not fetch {len(new_certs_ids) - len(new_certs)} new certificates")
+
+    return new_certs
+
+async def get_certificate(cert_id: str, semaphore: asyncio.Semaphore) -> dict:
+    """Fetch data of certificate and add its date"""
+
+    async with semaphore:
+        cert_data = await get_asset_data(cert_id)
+
+        if not cert_data:
+            return
 
         # add date to certificate data
         tx_id = cert_data.get('initial_mint_tx_hash')
-        cert_data["date"] = get_tx_timestamp(tx_id)
-
-        new_certs[cert_id] = cert_data
+        cert_data["date"] = await get_tx_timestamp(tx_id)
 
-    return new_certs
\ No newline at end of file
+        return cert_data
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+Module for the shared HTTP client.
+
+All requests to external APIs go through one aiohttp session,
+which keeps connections alive and pools them per host.
+The connector bounds concurrent requests per host, hosts with a request budget
+are rate limited and failed requests are retried with exponential backoff.
+"""
+
+import asyncio
+from typing import Optional
+
+import aiohttp
+from yarl import URL
+
+from unsigned_bot.config import (
+    HTTP_TIMEOUT,
+    HTTP_RETRIES,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_CONNECTIONS_PER_HOST
+)
+from unsigned_bot.log import logger
+from unsigned_bot.rate_limiter import rate_limiter
+
+
+# status codes worth another attempt
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+BACKOFF_BASE = 1 # sec
+BACKOFF_MAX = 30 # sec
+
+KEEPALIVE_TIMEOUT = 60 # sec
+
+
+class HTTPClient:
+    """Shared aiohttp session with per-host connection limit, timeouts and retries"""
+
+    def __init__(self, timeout: Optional[int] = HTTP_TIMEOUT, retries: Optional[int] = HTTP_RETRIES, max_connections: Optional[int] = HTTP_MAX_CONNECTIONS, max_connections_per_host: Optional[int] = HTTP_MAX_CONNECTIONS_PER_HOST):
+        self.timeout = timeout
+        self.retries = retries
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+
+        self._session = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Return shared session, create it inside the running event loop on first use"""
+
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=KEEPALIVE_TIMEOUT
+            )
+            # no total timeout, it would include waiting for a free connection of the host
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+        return self._session
+
+    async def request(self, method: str, url: str, as_json: Optional[bool] = True, **kwargs):
+        """
+        Send request and return decoded JSON (or text) of response.
+        Retry on connection errors, timeouts and retryable status codes.
+        Raise last error if all attempts fail.
+        """
+
+        session = self.get_session()
+
+        host = URL(url).host
+
+        for attempt in range(self.retries + 1):
+            try:
+                # wait for budget before sending, so timeout only covers the request itself
+                await rate_limiter.acquire(host)
+
+                async with session.request(method, url, **kwargs) as response:
+                    response.raise_for_status()
+
+                    if as_json:
+                        return await response.json(content_type=None)
+                    else:
+                        return await response.text()
+            except aiohttp.ClientResponseError as e:
+                if e.status not in RETRY_STATUS or attempt == self.retries:
+                    raise
+
+                delay = get_retry_after(e.headers) or get_backoff(attempt)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+
+                delay = get_backoff(attempt)
+
+            logger.debug(f"{method} {url} failed, retry in {delay} sec")
+            await asyncio.sleep(delay)
+
+    async def get_json(self, url: str, **kwargs):
+        """Send GET request and return decoded JSON"""
+        return await self.request("GET", url, **kwargs)
+
+    async def post_json(self, url: str, **kwargs):
+        """Send POST request and return decoded JSON"""
+        return await self.request("POST", url, **kwargs)
+
+    async def get_text(self, url: str, **kwargs) -> str:
+        """Send GET request and return text, e.g. HTML"""
+        return await self.request("GET", url, as_json=False, **kwargs)
+
+    async def close(self):
+        """Close shared session and its connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+        self._session = None
+
+
+def get_backoff(attempt: int) -> float:
+    """Return delay before next attempt, doubled with every attempt"""
+    return min(BACKOFF_BASE * 2**attempt, BACKOFF_MAX)
+
+def get_retry_after(headers) -> float:
+    """Return delay requested by server via 'Retry-After' header or None"""
+    try:
+        return min(float(headers.get("Retry-After")), BACKOFF_MAX)
+    except (AttributeError, TypeError, ValueError):
+        return
+
+
+# Initialize global http client
+http_client = HTTPClient()
@@ -0,0 +1,198 @@
+"""
+Module for the sales and certificates ledgers
+
+Sales are indexed by a key of marketplace and sale id, so checking
+whether a fetched sale is already known takes constant time
+regardless of the size of the sales history.
+
+Both ledgers are stored as append-only JSON Lines files. New and updated
+records are appended, the latest record of a key wins on replay.
+A write interrupted by a crash only loses its own incomplete line.
+"""
+
+import os
+from typing import Optional
+
+from unsigned_bot import ROOT_DIR
+from unsigned_bot.log import logger
+from unsigned_bot.utility.files_util import load_json, load_jsonl, append_jsonl, save_jsonl
+
+
+SALES_LEDGER_PATH = f"{ROOT_DIR}/data/json/sales.jsonl"
+CERTS_LEDGER_PATH = f"{ROOT_DIR}/data/json/certificates.jsonl"
+
+# former storage, migrated on first start
+SALES_JSON_PATH = f"{ROOT_DIR}/data/json/sales.json"
+CERTS_JSON_PATH = f"{ROOT_DIR}/data/json/certificates.json"
+
+# marketplaces using the asset id as sale id, thus a sale is only unique along with its date
+ASSET_ID_MARKETPLACES = {"jpgstore"}
+
+
+class SalesLedger:
+    """Sales history with hash index over sale keys"""
+
+    def __init__(self, sales: Optional[list] = None, path: Optional[str] = None):
+        self.sales = list()
+        self._index = dict()
+
+        if sales:
+            self.merge(sales)
+
+        self.path = path
+
+    @classmethod
+    def load(cls, path: Optional[str] = SALES_LEDGER_PATH, path_json: Optional[str] = SALES_JSON_PATH):
+        """Replay ledger file, migrate former JSON file first if ledger does not exist yet"""
+
+        migrate_json(path, path_json, lambda sales: sales)
+        return cls(load_jsonl(path), path)
+
+    def __len__(self) -> int:
+        return len(self.sales)
+
+    def __iter__(self):
+        return iter(self.sales)
+
+    def __contains__(self, sale: dict) -> bool:
+        return get_sale_key(sale) in self._index
+
+    def get_position(self, sale: dict) -> int:
+        """Return position of sale in ledger or None"""
+        return self._index.get(get_sale_key(sale))
+
+    def add(self, sales: list) -> tuple:
+        """Merge sales into ledger, persist and return new and updated sales"""
+
+        new_sales, updated_sales = self.merge(sales)
+
+        if self.path and (new_sales or updated_sales):
+            append_jsonl(self.path, new_sales + updated_sales)
+
+        return new_sales, updated_sales
+
+    def merge(self, sales: list) -> tuple:
+        """
+        Merge sales into ledger and return new and updated sales.
+        Unknown sales are appended. Known sales with changed data
+        are updated in place and not considered new.
+        """
+
+        new_sales = list()
+        updated_sales = list()
+
+        for sale in sales:
+            key = get_sale_key(sale)
+            position = self._index.get(key)
+
+            if position is None:
+                self._index[key] = len(self.sales)
+                self.sales.append(sale)
+                new_sales.append(sale)
+            else:
+                known_sale = self.sales[position]
+                changes = {field: value for field, value in sale.items() if known_sale.get(field) != value}
+
+                if changes:
+                    known_sale.update(changes)
+                    updated_sales.append(known_sale)
+
+        return new_sales, updated_sales
+
+
+class CertificateLedger:
+    """Certificates by asset id with registry by unsig number"""
+
+    def __init__(self, certs: Optional[list] = None, path: Optional[str] = None):
+        self.certs = dict()
+        self._by_number = dict()
+
+        if certs:
+            self.merge(certs)
+
+        self.path = path
+
+    @classmethod
+    def load(cls, path: Optional[str] = CERTS_LEDGER_PATH, path_json: Optional[str] = CERTS_JSON_PATH):
+        """Replay ledger file, migrate former JSON file first if ledger does not exist yet"""
+
+        migrate_json(path, path_json, lambda certs: list(certs.values()))
+        return cls(load_jsonl(path), path)
+
+    def __len__(self) -> int:
+        return len(self.certs)
+
+    def __contains__(self, cert_id: str) -> bool:
+        return cert_id in self.certs
+
+    def get_by_number(self, number) -> dict:
+        """Return latest certificate of unsig with given number or None"""
+        return self._by_number.get(int(number))
+
+    def add(self, certs: dict) -> dict:
+        """Merge certificates into ledger, persist and return new certificates"""
+
+        new_certs = {cert_id: cert for cert_id, cert in certs.items() if cert_id not in self.certs}
+        self.merge(list(new_certs.values()))
+
+        if self.path and new_certs:
+            append_jsonl(self.path, list(new_certs.values()))
+
+        return new_certs
+
+    def merge(self, certs: list):
+        """Merge certificates into ledger, latest data of a certificate wins"""
+        for cert in certs:
+            self.certs[cert.get("asset")] = cert
+
+            number = get_cert_number(cert)
+            if number is None:
+                continue
+
+            # unsig can be certified again, keep latest certificate
+            known_cert = self._by_number.get(number)
+            if not known_cert or (cert.get("date") or 0) >= (known_cert.get("date") or 0):
+                self._by_number[number] = cert
+
+
+def migrate_json(path: str, path_json: str, to_records):
+    """Convert JSON file of former storage into ledger file if it does not exist yet"""
+
+    if os.path.exists(path):
+        return
+
+    if not os.path.exists(path_json):
+        logger.info(f"No former storage {path_json}, start with empty ledger")
+        records = list()
+    else:
+        # do not create ledger, otherwise migration is skipped once the file is fixed
+        try:
+            records = to_records(load_json(path_json))
+        except:
+            logger.error(f"Can not migrate {path_json}")
+            raise
+
+    save_jsonl(path, records)
+    logger.info(f"{len(records)} records migrated to {path}")
+
+
+def get_cert_number(cert: dict) -> int:
+    """Return unsig number from metadata of certificate, e.g. '#00001'"""
+    try:
+        metadata = cert.get("onchain_metadata")
+        return int(metadata.get("Unsig number").replace("#", ""))
+    except:
+        return
+
+
+def get_sale_key(sale: dict) -> tuple:
+    """Return key identifying sale across marketplaces"""
+
+    marketplace = sale.get("marketplace")
+    sale_id = sale.get("id")
+
+    # fall back to asset and date if sale id is missing or not unique
+    if not sale_id or marketplace in ASSET_ID_MARKETPLACES:
+        return (marketplace, sale_id or sale.get("assetid"), sale.get("date"))
+
+    return (marketplace, sale_id)
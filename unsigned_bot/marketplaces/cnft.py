@@ -5,19 +5,25 @@ Module for fetching data from cnft.io marketplace
 from typing import Optional, List, Dict
 import copy
 import asyncio
-import aiohttp
-from aiohttp import ClientSession, ClientResponse
 
 from unsigned_bot.utility.time_util import datetime_to_timestamp
+from unsigned_bot.http_client import http_client
 from unsigned_bot.log import logger
 from unsigned_bot.parsing import add_num_props
+from unsigned_bot.sync import filter_newer_sales
 from unsigned_bot.urls import CNFT_API_URL
 
 MARKETPLACE = "cnft"
 
+BURST_SIZE = 25 # pages per burst of a full sync
+INCREMENTAL_BURST_SIZE = 2 # pages per burst if only newer sales are fetched
 
-async def fetch_data_from_marketplace(project_name: str, sold: Optional[bool] = False) -> list:
-    """Fetch assets data via pagination and return list of parsed assets"""
+
+async def fetch_data_from_marketplace(project_name: str, sold: Optional[bool] = False, since: Optional[dict] = None) -> list:
+    """
+    Fetch assets data via pagination and return list of parsed assets.
+    If high-water mark 'since' is given, stop at the first already known sale.
+    """
     
     url = CNFT_API_URL
 
@@ -37,14 +43,14 @@ async def fetch_data_from_marketplace(project_name: str, sold: Optional[bool] =
             "offer"
         ]
     
-    BURST_SIZE = 25
-    
+    burst_size = INCREMENTAL_BURST_SIZE if since else BURST_SIZE
+
     assets_total = list()
 
     fetching = True
     num_requests = 1
     while fetching:
-        pages = range((num_requests-1) * BURST_SIZE, num_requests*BURST_SIZE)
+        pages = range((num_requests-1) * burst_size, num_requests*burst_size)
         payloads = get_payloads(pages, payload)
 
         try:
@@ -53,10 +59,22 @@ async def fetch_data_from_marketplace(project_name: str, sold: Optional[bool] =
             logger.warning(f"Fetching data from {MARKETPLACE.upper()} failed")
             return
         else:
+            failed_pages = [page + 1 for page, response in zip(pages, responses) if isinstance(response, BaseException)]
+            if failed_pages:
+                # missing pages would be taken as complete data
+                logger.warning(f"Fetching pages {', '.join(map(str, failed_pages))} from {MARKETPLACE.upper()} failed")
+                return
+
             if responses:
                 assets = get_data_from_responses(responses)
                 if assets:
                     assets_parsed = parse_data(assets, sold)
+
+                    if since:
+                        assets_parsed, reached = filter_newer_sales(assets_parsed, since)
+                        if reached:
+                            fetching = False
+
                     assets_extended = add_num_props(assets_parsed)
                     assets_total.extend(assets_extended)
                 else:
@@ -71,11 +89,10 @@ async def fetch_data_from_marketplace(project_name: str, sold: Optional[bool] =
 async def fetch_all(url: str, payloads: List[dict]) -> list:
     """Make concurrent requests to url with given payloads and return responses"""
 
-    async with aiohttp.ClientSession() as session:
-        tasks = get_tasks_for_pagination(session, url, payloads)
-        responses = await asyncio.gather(*tasks, return_exceptions=True)
+    tasks = [http_client.post_json(url, json=payload) for payload in payloads]
+    responses = await asyncio.gather(*tasks, return_exceptions=True)
 
-        return responses
+    return responses
 
 def get_payloads(pages: List[int], payload: dict) -> list:
     """Duplicate payload for given pages and return payloads"""
@@ -90,33 +107,13 @@ def get_payloads(pages: List[int], payload: dict) -> list:
     
     return payloads
 
-def get_tasks_for_pagination(session: ClientSession, url: str, payloads: List[dict]) -> list:
-    """Add fetching tasks for session and return tasks"""
-
-    tasks = list()
-    for payload in payloads:
-        tasks.append(fetch(session, url, payload))
-
-    return tasks     
-
-async def fetch(session: ClientSession, url: str, payload: dict) -> ClientResponse:
-    """Return response from requests inside given session"""
-
-    async with session.post(url, json=payload) as response:
-        try:
-            resp = await response.json()
-        except:
-            return
-        else:
-            return resp
-
 def get_data_from_responses(responses: List[dict]) -> list:
     """Parse list of responses and return extracted assets"""
 
     assets = list()
 
     for response in responses:
-        if response:
+        if isinstance(response, dict):
             assets_found = response.get("results")
             if assets_found:
                 assets.extend(assets_found)
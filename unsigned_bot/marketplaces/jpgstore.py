@@ -3,30 +3,39 @@ Module for fetching data from jpg.store marketplace
 """
 
 from typing import Optional
-import requests
 
 from unsigned_bot.utility.time_util import datetime_to_timestamp
+from unsigned_bot.http_client import http_client
 from unsigned_bot.log import logger
 from unsigned_bot.parsing import add_num_props
+from unsigned_bot.sync import filter_newer_sales
 from unsigned_bot.urls import JPGSTORE_API_URL
 
 MARKETPLACE = "jpgstore"
 
 
-async def get_data_from_marketplace(policy_id: str, sold: Optional[bool] = False) -> list:
-    """Fetch all assets and return list of parsed assets"""
+async def get_data_from_marketplace(policy_id: str, sold: Optional[bool] = False, since: Optional[dict] = None) -> list:
+    """
+    Fetch all assets and return list of parsed assets.
+    If high-water mark 'since' is given, return only newer sales.
+    """
     
     request_type = "sales" if sold else "listings"
     url = f"{JPGSTORE_API_URL}/policy/{policy_id}/{request_type}"
 
     try:
-        response = requests.get(url).json()
+        response = await http_client.get_json(url)
     except:
         logger.warning(f"Fetching data from {MARKETPLACE.upper()} failed")
         return
     else:
         if isinstance(response, list):
             assets_parsed = parse_data(response, sold)
+
+            # API returns all sales at once, keep only newer ones
+            if since:
+                assets_parsed, _ = filter_newer_sales(assets_parsed, since)
+
             assets_extended = add_num_props(assets_parsed)
         
         logger.info(f"{len(assets_extended)} assets found at {MARKETPLACE.upper()}")
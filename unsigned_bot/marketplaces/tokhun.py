@@ -3,18 +3,21 @@ Module for fetching data from tokhun.io marketplace
 """
 
 from typing import Optional
-import requests
-from ratelimit import limits
 
+from unsigned_bot.http_client import http_client
 from unsigned_bot.log import logger
 from unsigned_bot.parsing import add_num_props
+from unsigned_bot.sync import filter_newer_sales
 from unsigned_bot.urls import TOKHUN_API_URL
 
 MARKETPLACE = "tokhun"
 
 
-async def get_data_from_marketplace(policy_id: str, sold: Optional[bool] = False) -> list:
-    """Fetch assets data via pagination and return list of parsed assets"""
+async def get_data_from_marketplace(policy_id: str, sold: Optional[bool] = False, since: Optional[dict] = None) -> list:
+    """
+    Fetch assets data via pagination and return list of parsed assets.
+    If high-water mark 'since' is given, stop at the first already known sale.
+    """
 
     if sold:
         url = f"{TOKHUN_API_URL}/sold"
@@ -33,7 +36,7 @@ async def get_data_from_marketplace(policy_id: str, sold: Optional[bool] = False
     next_page = True
     while next_page:
         try:
-            response = call_api(url, params).json()
+            response = await call_api(url, params)
         except:
             logger.warning(f"Fetching data from {MARKETPLACE.upper()} failed")
             return
@@ -41,6 +44,12 @@ async def get_data_from_marketplace(policy_id: str, sold: Optional[bool] = False
             new_assets = response.get("data")
             if new_assets:
                 assets_parsed = parse_data(new_assets, sold)
+
+                if since:
+                    assets_parsed, reached = filter_newer_sales(assets_parsed, since)
+                    if reached:
+                        next_page = False
+
                 assets_extended = add_num_props(assets_parsed)
                 assets_all.extend(assets_extended)
             else:
@@ -52,15 +61,9 @@ async def get_data_from_marketplace(policy_id: str, sold: Optional[bool] = False
     
     return assets_all
 
-@limits(calls=10, period=60)
-def call_api(url: str, params: dict) -> dict:
-    """Request API with rate limit of 10 calls per minute"""
-
-    response = requests.get(url, params=params)
-    if response.status_code != 200:
-        raise Exception('API response: {}'.format(response.status_code))
-        
-    return response
+async def call_api(url: str, params: dict) -> dict:
+    """Request API, rate limit of 10 calls per minute is applied by http client"""
+    return await http_client.get_json(url, params=params)
 
 def parse_data(assets: list, sold=False) -> list:
     """
@@ -0,0 +1,154 @@
+"""
+Module for the precomputed matches index of the entire collection.
+
+For each side the index is stored in CSR format:
+'offsets' (int64) point into 'neighbors' (int16), so the matches of unsig n
+on a side are neighbors[offsets[n]:offsets[n+1]].
+Arrays are memory-mapped, reading matches of one unsig only touches its row.
+
+Build index from command line:
+    python -m unsigned_bot.matches_index [--processes N] [--force]
+"""
+
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from unsigned_bot import ROOT_DIR
+from unsigned_bot.constants import MAX_AMOUNT
+from unsigned_bot.log import logger
+from unsigned_bot.utility.files_util import save_array, is_up_to_date
+from unsigned_bot.dataset import UNSIGS_PATH, on_reload
+from unsigned_bot.matching import SIDES, match_unsig
+
+
+MATCHES_INDEX_PATH = f"{ROOT_DIR}/data/all_matches"
+
+CHUNK_SIZE = 500
+
+_index = None
+
+
+def get_index_files(side: str, path: Optional[str] = MATCHES_INDEX_PATH) -> tuple:
+    """Return paths of offsets and neighbors file for given side"""
+    return (f"{path}/{side}_offsets.npy", f"{path}/{side}_neighbors.npy")
+
+def index_is_valid(path: Optional[str] = MATCHES_INDEX_PATH, source_path: Optional[str] = UNSIGS_PATH) -> bool:
+    """Check if index files exist and are newer than unsigs data"""
+    paths = [file_path for side in SIDES for file_path in get_index_files(side, path)]
+    return is_up_to_date(paths, source_path)
+
+def match_chunk(numbers: list) -> list:
+    """Match each of given unsigs with entire collection and return neighbors per side"""
+
+    collection = range(0, MAX_AMOUNT)
+
+    rows = list()
+    for number in numbers:
+        matches = match_unsig(number, collection)
+        rows.append({side: np.asarray(matches.get(side, []), dtype=np.int16) for side in SIDES})
+
+    return rows
+
+def build_matches_index(path: Optional[str] = MATCHES_INDEX_PATH, processes: Optional[int] = None, force: Optional[bool] = False) -> bool:
+    """
+    Compute matches of all unsigs with entire collection and save index.
+    Rows are computed in chunks across a process pool.
+    Return False if existing index is up to date and rebuild is not forced.
+    """
+
+    if not force and index_is_valid(path):
+        logger.info("Matches index is up to date")
+        return False
+
+    os.makedirs(path, exist_ok=True)
+
+    numbers = list(range(0, MAX_AMOUNT))
+    chunks = [numbers[i:i + CHUNK_SIZE] for i in range(0, len(numbers), CHUNK_SIZE)]
+
+    neighbors = {side: list() for side in SIDES}
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for i, rows in enumerate(executor.map(match_chunk, chunks)):
+            for row in rows:
+                for side in SIDES:
+                    neighbors[side].append(row[side])
+
+            logger.info(f"Matched {min((i+1) * CHUNK_SIZE, MAX_AMOUNT)}/{MAX_AMOUNT} unsigs")
+
+    for side in SIDES:
+        lengths = [len(row) for row in neighbors[side]]
+        offsets = np.zeros(MAX_AMOUNT + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(lengths)
+
+        offsets_path, neighbors_path = get_index_files(side, path)
+        save_array(offsets_path, offsets)
+        save_array(neighbors_path, np.concatenate(neighbors[side]).astype(np.int16))
+
+    logger.info(f"Matches index saved to {path}")
+
+    return True
+
+def load_matches_index(path: Optional[str] = MATCHES_INDEX_PATH) -> dict:
+    """Memory-map offsets and neighbors of all sides"""
+    global _index
+
+    index = dict()
+    for side in SIDES:
+        offsets_path, neighbors_path = get_index_files(side, path)
+        index[side] = (np.load(offsets_path, mmap_mode="r"), np.load(neighbors_path, mmap_mode="r"))
+
+    _index = index
+
+    return _index
+
+def reset_matches_index():
+    """Unmap index, it is checked against reloaded unsigs data on next access"""
+    global _index
+    _index = None
+
+on_reload(reset_matches_index)
+
+def load_matches(number: str) -> dict:
+    """
+    Read matches of given unsig with entire collection from index.
+    Return None if index is not available or outdated.
+    """
+
+    if _index is None:
+        if not index_is_valid():
+            return
+
+        try:
+            load_matches_index()
+        except OSError:
+            return
+
+    idx = int(number)
+
+    matches = dict()
+    for side in SIDES:
+        offsets, neighbors = _index[side]
+        start, end = offsets[idx], offsets[idx+1]
+
+        if end > start:
+            matches[side] = neighbors[start:end].astype(int).tolist()
+
+    # same order of sides as 'match_unsig' (sides with lowest matching number first)
+    return dict(sorted(matches.items(), key=lambda item: item[1][0]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build matches index of entire unsigs collection")
+    parser.add_argument("--processes", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--force", action="store_true", help="rebuild index even if it is up to date")
+    args = parser.parse_args()
+
+    build_matches_index(processes=args.processes, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,23 @@ import random
 from collections import defaultdict
 from typing import List, Optional
 
-from unsigned_bot.utility.files_util import load_json
+import numpy as np
+
 from unsigned_bot.utility.geom_util import get_opposite_side, get_rotations_from_direction
+from unsigned_bot.dataset import get_unsig, get_layers, get_layer_arrays, on_reload, DISTRIBUTION_CODES
 from unsigned_bot.deconstruct import get_prop_layers, order_by_color, get_subpattern, format_subpattern
 from unsigned_bot import ROOT_DIR
 
 
+SIDES = ["top", "left", "right", "bottom"]
+COLORS = ["Red", "Green", "Blue"]
+
+_side_signatures = None
+_side_compatibilities = dict()
+_symmetry_index = None
+_structure_index = None
+
+
 def choose_random_matches(number: str, matches: dict) -> dict:
     """Choose random selection (one unsig per side) from all available matches"""
 
@@ -31,9 +42,12 @@ def choose_random_matches(number: str, matches: dict) -> dict:
     return random_matches
 
 def match_unsig(number: str, numbers: list) -> dict:
-    """Try to match unsig with given list of unsigs and return all possible matches."""
+    """
+    Try to match unsig with given list of unsigs and return all possible matches.
 
-    unsigs = load_json(f"{ROOT_DIR}/data/json/unsigs.json")
+    All unsigs of the list are matched at once by looking up
+    the compatibility of their side signatures (see 'get_side_signatures').
+    """
 
     matches = defaultdict(list)
 
@@ -41,18 +55,95 @@ def match_unsig(number: str, numbers: list) -> dict:
     if idx == 0:
         return dict()
 
-    u1 = unsigs.get(str(idx))
+    state_ids, _ = get_side_signatures()
+
+    candidates = np.asarray(numbers, dtype=np.int64).reshape(-1)
+    candidates = candidates[candidates != idx]
+    candidates_states = state_ids[candidates]
 
-    for j in numbers:
-        if idx!=j:
-            u2 = unsigs.get(str(j))
-            matches_sides = get_matches(u1, u2)
+    matches_by_side = dict()
+    first_positions = dict()
+
+    for side in SIDES:
+        matched = np.ones(len(candidates), dtype=bool)
+
+        for c in range(len(COLORS)):
+            compatibility = get_side_compatibility(side, state_ids[idx, c])
+            matched &= compatibility[candidates_states[:, c]]
+
+        positions = np.flatnonzero(matched)
+        if positions.size:
+            matches_by_side[side] = candidates[positions].tolist()
+            first_positions[side] = positions[0]
+
+    # add sides in same order as matching unsigs one by one would do
+    for side in sorted(first_positions, key=first_positions.get):
+        matches[side] = matches_by_side[side]
 
-            for side in matches_sides:
-                matches[side].append(j)
-                
     return matches
 
+def get_side_signatures() -> tuple:
+    """
+    Return side signatures of all unsigs and list of channel states.
+
+    The signature of an unsig consists of one state per color channel.
+    A state contains the sorted layers of a channel without their color,
+    so channels with identical states match identically on every side.
+    Signatures are returned as array of state ids with shape (MAX_AMOUNT, 3).
+    """
+    global _side_signatures
+
+    if _side_signatures is not None:
+        return _side_signatures
+
+    arrays = get_layer_arrays()
+
+    num_props = arrays.num_props.tolist()
+    colors = arrays.colors.tolist()
+    multipliers = arrays.multipliers.tolist()
+    rotations = arrays.rotations.tolist()
+    distributions = arrays.distributions.tolist()
+
+    states = list()
+    states_ids = dict()
+
+    state_ids = np.zeros((len(num_props), len(COLORS)), dtype=np.int32)
+
+    for idx, num in enumerate(num_props):
+        channels = [list() for _ in COLORS]
+
+        for i in range(num):
+            layer = (None, multipliers[idx][i], rotations[idx][i] * 90, DISTRIBUTION_CODES[distributions[idx][i]])
+            channels[colors[idx][i]].append(layer)
+
+        for c, channel_layers in enumerate(channels):
+            state = tuple(sorted(channel_layers))
+
+            if state not in states_ids:
+                states_ids[state] = len(states)
+                states.append(state)
+
+            state_ids[idx, c] = states_ids[state]
+
+    _side_signatures = (state_ids, states)
+    _side_compatibilities.clear()
+
+    return _side_signatures
+
+def get_side_compatibility(side: str, state_id: int) -> np.ndarray:
+    """Return boolean array which states of other unsigs match channel state on given side"""
+
+    key = (side, int(state_id))
+
+    if key not in _side_compatibilities:
+        _, states = get_side_signatures()
+        state = states[state_id]
+
+        compatibility = [match_color_layers(state, other_state, side) for other_state in states]
+        _side_compatibilities[key] = np.array(compatibility, dtype=bool)
+
+    return _side_compatibilities[key]
+
 def get_matches(udata1: dict, udata2: dict) -> list:
     """
     Try to find matches of each side for two given unsigs.
@@ -70,86 +161,78 @@ def get_matches(udata1: dict, udata2: dict) -> list:
 
     matches = list()
 
-    for side in ["top", "left", "right", "bottom"]:
-
-        # get direction from side
-        direction = "horizontal" if side == "left" or side == "right" else "vertical"
-
-        for color in ["Red", "Green", "Blue"]:
+    for side in SIDES:
+        for color in COLORS:
             color_layers1 = layers1_ordered.get(color)
             color_layers2 = layers2_ordered.get(color)
 
-            num_layers1 = len(color_layers1) if color_layers1 else 0
-            num_layers2 = len(color_layers2) if color_layers2 else 0
-
-            # === colors layers for first unsig do NOT exist ===
-            if not color_layers1:
-                if not color_layers2:
-                    continue # potential match because color layers do not exist in both unsigs
-                else:
-                    if num_layers2 > 1:
-                        break # no match because sides of unsig with more than 1 color layer can not be black
-                    else:
-                        opposite_side = get_opposite_side(side)
-                        if side_is_black(color_layers2[0], opposite_side):
-                            continue # potential match because both matching sides are black (or not existent)
-                        else:
-                            break # no match because one side is not black
-            
-            # === colors layers for first unsig do exist ===
-            else:
-                if not color_layers2:
-                    if num_layers1 > 1:
-                        break
-                    else:
-                        if side_is_black(color_layers1[0], side):
-                            continue
-                        else:
-                            break
-                else:
-                    # === color layers for both unsigs have only one layer ===
-                    if num_layers1 == 1 and num_layers2 == 1:
-
-                        layer1 = color_layers1[0]
-                        layer2 = color_layers2[0]
-                        
-                        mirrored = mirror_layer(layer1, direction)
-
-                        if mirrored == layer2:
-                            continue # potential match because mirrored layers are identical
-                        else:
-                            if side_is_black(layer1, side) and side_is_black(layer2, get_opposite_side(side)):
-                                continue # potential match because both matching sides are black
-                            else:
-                                if get_side_value(layer1, side):
-                                    if get_side_value(layer1, side) == get_side_value(layer2, get_opposite_side(side)):
-                                        continue # potential match because both matching sides have identical color values
-                                    else:
-                                        break # no match because both matching sides have different color values
-                                else:
-                                    break # no match because side of first color layer has not a single color value
-
-                    # === color layers for unsig have different number of layers but at least one ===
-                    else:
-                        for layer in color_layers1:
-                            rot = layer[2]
-                            rotations_to_match = get_rotations_from_direction(direction)
-
-                            if rot not in rotations_to_match:
-                                continue
-                            else:
-                                if layer in color_layers2:
-                                    break # match because layers in relevant direction are identical
-                                else:
-                                    continue # no match because layers in relevant direction are different
-                        else:
-                            break # break outer loop cause no match found in inner loop
+            if not match_color_layers(color_layers1, color_layers2, side):
+                break
         else:
             # unsigs match on current side if loop is not interrupted
             matches.append(side)   
 
     return matches   
 
+def match_color_layers(color_layers1: list, color_layers2: list, side: str) -> bool:
+    """Check if layers of one color channel of two unsigs match on given side"""
+
+    # get direction from side
+    direction = "horizontal" if side == "left" or side == "right" else "vertical"
+
+    num_layers1 = len(color_layers1) if color_layers1 else 0
+    num_layers2 = len(color_layers2) if color_layers2 else 0
+
+    # === colors layers for first unsig do NOT exist ===
+    if not color_layers1:
+        if not color_layers2:
+            return True # potential match because color layers do not exist in both unsigs
+        else:
+            if num_layers2 > 1:
+                return False # no match because sides of unsig with more than 1 color layer can not be black
+            else:
+                opposite_side = get_opposite_side(side)
+                # potential match if both matching sides are black (or not existent)
+                return side_is_black(color_layers2[0], opposite_side)
+
+    # === colors layers for first unsig do exist ===
+    if not color_layers2:
+        if num_layers1 > 1:
+            return False
+        else:
+            return side_is_black(color_layers1[0], side)
+
+    # === color layers for both unsigs have only one layer ===
+    if num_layers1 == 1 and num_layers2 == 1:
+
+        layer1 = color_layers1[0]
+        layer2 = color_layers2[0]
+        
+        mirrored = mirror_layer(layer1, direction)
+
+        if mirrored == layer2:
+            return True # potential match because mirrored layers are identical
+
+        if side_is_black(layer1, side) and side_is_black(layer2, get_opposite_side(side)):
+            return True # potential match because both matching sides are black
+
+        side_value = get_side_value(layer1, side)
+        if side_value:
+            # potential match if both matching sides have identical color values
+            return side_value == get_side_value(layer2, get_opposite_side(side))
+        else:
+            return False # no match because side of first color layer has not a single color value
+
+    # === color layers for unsig have different number of layers but at least one ===
+    rotations_to_match = get_rotations_from_direction(direction)
+
+    for layer in color_layers1:
+        rot = layer[2]
+        if rot in rotations_to_match and layer in color_layers2:
+            return True # match because layers in relevant direction are identical
+    else:
+        return False # no match because layers in relevant direction are different
+
 def get_side_value(layer: tuple, side: str) -> int:
     """Get single color value of given side if existing"""
 
@@ -256,31 +339,148 @@ def get_similar_unsigs(number: str, numbers: List[int], structural: Optional[boo
         - get unsigs with structural similarity (structural=True)
     """
 
-    unsigs = load_json(f"{ROOT_DIR}/data/json/unsigs.json")
-
     similar_unsigs = defaultdict(list)
 
     idx = int(number)
-    u1 = unsigs.get(str(idx)) 
+    u1 = get_unsig(idx)
 
     num1_props = u1.get("num_props") 
     if num1_props == 0:
         return 
 
-    for num in numbers:
-        if idx!=num:
-            u2 = unsigs.get(str(num))
+    # only unsigs with same symmetry / structure key can be similar
+    symmetric = set(get_symmetric_unsigs(idx))
+
+    related = set(symmetric)
+    if structural:
+        related.update(get_structural_unsigs(idx))
+
+    numbers_set = set(numbers)
+
+    for num in sorted(related):
+        if num in numbers_set:
+            u2 = get_unsig(num)
             num2_props = u2.get("num_props") 
 
             if num1_props != num2_props:
                 continue
             else:
-                similarity = check_similarity(u1, u2, structural) 
+                if num in symmetric:
+                    similarity = check_similarity(u1, u2, structural)
+                elif check_structural_similarity(get_prop_layers(u1), get_prop_layers(u2)):
+                    similarity = "structural_similarity"
+                else:
+                    similarity = None
+
                 if similarity:
                     similar_unsigs[similarity].append(num)
     
     return similar_unsigs
 
+def get_variations(layers: list) -> list:
+    """Return all 8 rotated and mirrored variations of given layers"""
+
+    variations = list()
+
+    for rotation in [0, 90, 180, 270]:
+        rotated = rotate_layers(layers, rotation)
+        variations.append(rotated)
+
+        mirrored = mirror_layers(rotated, "vertical")
+        variations.append(mirrored)
+
+    return variations
+
+def get_symmetry_key(layers: list) -> tuple:
+    """
+    Return canonical form of given layers regarding symmetry.
+
+    The key is the lexicographically smallest sorted layer tuple
+    of all rotated and mirrored variations of the layers.
+    Unsigs with axial or point symmetry share the same key.
+    """
+    return min(tuple(sorted(variation)) for variation in get_variations(layers))
+
+def get_structure_key(layers: list) -> tuple:
+    """
+    Return canonical form of given layers regarding structural similarity.
+
+    Subpatterns are compared regardless of their color and a rotation by 180 degrees.
+    The key is the smallest sorted set of those subpatterns
+    of all rotated and mirrored variations of the layers.
+    Structural similar unsigs share the same key.
+    """
+
+    keys = list()
+
+    for variation in get_variations(layers):
+        subpattern = format_subpattern(get_subpattern(variation))
+        canonical = {min(layers, tuple(sorted(rotate_layers(layers, 180)))) for layers in subpattern}
+        keys.append(tuple(sorted(canonical)))
+
+    return min(keys)
+
+def build_index(get_key) -> dict:
+    """Return mapping of keys to numbers of all unsigs with that key"""
+
+    num_props = get_layer_arrays().num_props
+
+    index = defaultdict(list)
+    for num in range(len(num_props)):
+        key = get_key(get_layers(num))
+        index[key].append(num)
+
+    return dict(index)
+
+def get_symmetry_index() -> dict:
+    """Return index of symmetry keys of all unsigs"""
+    global _symmetry_index
+
+    if _symmetry_index is None:
+        _symmetry_index = build_index(get_symmetry_key)
+
+    return _symmetry_index
+
+def get_structure_index() -> dict:
+    """Return index of structure keys of all unsigs"""
+    global _structure_index
+
+    if _structure_index is None:
+        _structure_index = build_index(get_structure_key)
+
+    return _structure_index
+
+def reset_indexes():
+    """Drop signatures and indexes built from outdated unsigs data"""
+    global _side_signatures, _symmetry_index, _structure_index
+
+    _side_signatures = None
+    _side_compatibilities.clear()
+    _symmetry_index = None
+    _structure_index = None
+
+on_reload(reset_indexes)
+
+def get_symmetric_unsigs(number: str) -> list:
+    """Return numbers of unsigs sharing the symmetry key of given unsig"""
+
+    idx = int(number)
+    key = get_symmetry_key(get_layers(idx))
+
+    index = get_symmetry_index()
+
+    return [num for num in index.get(key, []) if num != idx]
+
+def get_structural_unsigs(number: str) -> list:
+    """Return numbers of unsigs sharing the structure key of given unsig"""
+
+    idx = int(number)
+    key = get_structure_key(get_layers(idx))
+
+    index = get_structure_index()
+
+    return [num for num in index.get(key, []) if num != idx]
+
 def check_similarity(u1_data: dict, u2_data: dict, structural: Optional[bool] = True) -> str:
     """Check similarity between two unsigs regarding symmetry and structural similarity (optional)"""
 
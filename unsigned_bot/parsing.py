@@ -9,6 +9,7 @@ from operator import itemgetter
 from collections import defaultdict
 
 from unsigned_bot.utility.files_util import load_json
+from unsigned_bot.dataset import get_unsig
 from unsigned_bot.constants import MAX_AMOUNT
 from unsigned_bot.urls import UNSIGS_URL, CNFT_URL, TOKHUN_URL, JPGSTORE_URL
 from unsigned_bot import ROOT_DIR
@@ -71,18 +72,6 @@ def order_by_num_props(assets: list) -> dict:
 
     return ordered
 
-def get_certificate_data_by_number(number, certificates: dict) -> dict:
-    """Try to find certificate data by given unsig number"""
-    for _, data in certificates.items():
-        metadata = data.get("onchain_metadata")
-
-        if metadata:
-            unsig_number = metadata.get("Unsig number")
-            if unsig_number == f"#{str(number).zfill(5)}":
-                return data   
-    else:
-        return None
-
 def filter_by_time_interval(assets: list, interval_ms) -> list:
     timestamp_now = round(time.time() * 1000)
     
@@ -103,9 +92,6 @@ def filter_sales_by_asset(sales, asset_name):
 def sort_sales_by_date(sales, descending=False):
     return sorted(sales, key=itemgetter('date'), reverse=descending)
 
-def filter_new_sales(past_sales, new_sales):
-    return [sale for sale in new_sales if sale not in past_sales]
-
 def filter_assets_by_type(assets: list, *types) -> list:
     return [asset for asset in assets if asset.get("type") in types]
 
@@ -163,15 +149,13 @@ def parse_sale(sale_data: dict) -> tuple:
     return (marketplace_name, num_props, price, date)
 
 def add_num_props(assets: list) -> list:
-    """Load unsigs data from file and add number of properties to each unsig"""
-
-    unsigs = load_json(f"{ROOT_DIR}/data/json/unsigs.json")
+    """Add number of properties to each unsig"""
 
     for asset in assets:
         asset_name = asset.get("assetid")
         idx = get_idx_from_asset_name(asset_name)
 
-        unsigs_data = unsigs.get(str(idx))
+        unsigs_data = get_unsig(idx)
         asset["num_props"] = unsigs_data.get("num_props")
     
     return assets
\ No newline at end of file
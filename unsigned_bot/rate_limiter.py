@@ -0,0 +1,94 @@
+"""
+Module for rate limiting requests.
+
+Each host with a request budget gets a token bucket. Requests wait
+for a free token with asyncio.sleep, so waiting never blocks the event loop,
+and waiting requests are served in order of arrival.
+"""
+
+import time
+import asyncio
+from typing import Optional
+
+from unsigned_bot.config import RATE_LIMITS
+
+
+class TokenBucket:
+    """Token bucket refilling 'calls' tokens per 'period' seconds"""
+
+    def __init__(self, calls: int, period: float, burst: Optional[int] = 1):
+        self.rate = calls / period
+        self.capacity = burst
+
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+        self.waiting = 0
+        self.acquired = 0
+        self.wait_time = 0.0
+
+        self._lock = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and consume it"""
+
+        # lock is created inside the running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        start = time.monotonic()
+        self.waiting += 1
+
+        try:
+            async with self._lock:
+                self._refill()
+
+                while self.tokens < 1:
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+                    self._refill()
+
+                self.tokens -= 1
+        finally:
+            self.waiting -= 1
+
+        self.acquired += 1
+        self.wait_time += time.monotonic() - start
+
+    def stats(self) -> dict:
+        """Return queue depth and counters of bucket"""
+        return {
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "wait_time": round(self.wait_time, 1)
+        }
+
+
+class RateLimiter:
+    """Token buckets for hosts with request budget"""
+
+    def __init__(self, limits: Optional[dict] = RATE_LIMITS):
+        self.buckets = {host: TokenBucket(calls, period) for host, (calls, period) in limits.items()}
+
+    async def acquire(self, host: str):
+        """Wait for capacity of given host, hosts without budget pass immediately"""
+        bucket = self.buckets.get(host)
+        if bucket:
+            await bucket.acquire()
+
+    def queue_depth(self, host: str) -> int:
+        """Return number of requests waiting for capacity of given host"""
+        bucket = self.buckets.get(host)
+        return bucket.waiting if bucket else 0
+
+    def stats(self) -> dict:
+        """Return queue depth and counters for each host"""
+        return {host: bucket.stats() for host, bucket in self.buckets.items()}
+
+
+# Initialize global rate limiter
+rate_limiter = RateLimiter()
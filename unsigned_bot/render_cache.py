@@ -0,0 +1,189 @@
+"""
+Module for caching rendered images.
+
+Encoded images are cached by (unsig number, dimension, view type)
+in memory and on disk. Both levels evict least recently used entries
+as soon as their size limit in bytes is exceeded.
+
+Files on disk carry the cache version in their name, files
+of other versions are removed when the cache is created.
+"""
+
+import os
+from collections import OrderedDict
+from typing import Optional
+
+from unsigned_bot import IMAGE_PATH
+from unsigned_bot.dataset import on_reload
+from unsigned_bot.log import logger
+
+
+CACHE_PATH = f"{IMAGE_PATH}/cache"
+
+MAX_MEMORY_BYTES = 64 * 1024**2
+MAX_DISK_BYTES = 512 * 1024**2
+
+# increase whenever rendering or encoding of images changes
+CACHE_VERSION = 3
+
+
+class RenderCache:
+    """LRU cache for encoded images with memory and disk level"""
+
+    def __init__(self, path: Optional[str] = CACHE_PATH, max_memory_bytes: Optional[int] = MAX_MEMORY_BYTES, max_disk_bytes: Optional[int] = MAX_DISK_BYTES, version: Optional[int] = CACHE_VERSION):
+        self.path = path
+        self.version = version
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self.hits = 0
+        self.misses = 0
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+
+        self._scan_disk()
+
+    def get(self, key: tuple) -> bytes:
+        """Return cached image data for given key or None"""
+
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return data
+
+        data = self._read_disk(key)
+        if data is not None:
+            self._add_to_memory(key, data)
+            self.hits += 1
+            return data
+
+        self.misses += 1
+
+    def put(self, key: tuple, data: bytes):
+        """Add image data for given key to cache"""
+        self._add_to_memory(key, data)
+        self._write_disk(key, data)
+
+    def clear(self):
+        """Remove all entries from memory and disk"""
+        self._memory.clear()
+        self._memory_bytes = 0
+
+        for name in list(self._disk.keys()):
+            self._remove_from_disk(name)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current cache sizes"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_bytes
+        }
+
+    def _add_to_memory(self, key: tuple, data: bytes):
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+
+        # skip entries which would evict the whole cache
+        if len(data) > self.max_memory_bytes:
+            return
+
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _get_file_path(self, key: tuple) -> str:
+        return f"{self.path}/v{self.version}_{'_'.join(map(str, key))}"
+
+    def _scan_disk(self):
+        """Register files of previous runs, oldest files first; remove files of other versions"""
+        try:
+            files = sorted(os.scandir(self.path), key=lambda f: f.stat().st_mtime)
+        except FileNotFoundError:
+            return
+
+        prefix = f"v{self.version}_"
+
+        for file in files:
+            if not file.is_file():
+                continue
+
+            if file.name.startswith(prefix) and not file.name.endswith(".tmp"):
+                self._disk[file.name] = file.stat().st_size
+                self._disk_bytes += file.stat().st_size
+            else:
+                try:
+                    os.unlink(file.path)
+                except OSError:
+                    pass
+
+    def _read_disk(self, key: tuple) -> bytes:
+        name = os.path.basename(self._get_file_path(key))
+        if name not in self._disk:
+            return
+
+        try:
+            with open(self._get_file_path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            self._forget_disk_entry(name)
+            return
+        else:
+            self._disk.move_to_end(name)
+            return data
+
+    def _write_disk(self, key: tuple, data: bytes):
+        if len(data) > self.max_disk_bytes:
+            return
+
+        path = self._get_file_path(key)
+        name = os.path.basename(path)
+
+        try:
+            os.makedirs(self.path, exist_ok=True)
+
+            with open(f"{path}.tmp", "wb") as f:
+                f.write(data)
+            os.replace(f"{path}.tmp", path)
+        except OSError:
+            logger.warning(f"Can not write {name} to render cache")
+            return
+
+        self._forget_disk_entry(name)
+        self._disk[name] = len(data)
+        self._disk_bytes += len(data)
+
+        while self._disk_bytes > self.max_disk_bytes:
+            oldest = next(iter(self._disk))
+            self._remove_from_disk(oldest)
+
+    def _remove_from_disk(self, name: str):
+        try:
+            os.unlink(f"{self.path}/{name}")
+        except OSError:
+            pass
+
+        self._forget_disk_entry(name)
+
+    def _forget_disk_entry(self, name: str):
+        size = self._disk.pop(name, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+
+# Initialize global render cache
+render_cache = RenderCache()
+
+# drop images rendered from outdated unsigs data
+on_reload(render_cache.clear)
@@ -0,0 +1,98 @@
+"""
+Module for rendering images outside of the event loop.
+
+Render jobs are synchronous functions which are dispatched to a pool of processes,
+so the bot stays responsive while several images are rendered in parallel.
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from unsigned_bot.config import RENDER_PROCESSES, RENDER_QUEUE_SIZE, RENDER_TIMEOUT
+from unsigned_bot.dataset import get_unsigs, on_reload
+from unsigned_bot.log import logger
+
+
+class RenderQueueFull(Exception):
+    """Raised if too many render jobs are pending"""
+
+
+class RenderService:
+    """Run render jobs in a process pool with bounded queue and timeout per job"""
+
+    def __init__(self, processes: Optional[int] = RENDER_PROCESSES, queue_size: Optional[int] = RENDER_QUEUE_SIZE, timeout: Optional[float] = RENDER_TIMEOUT):
+        self.processes = processes
+        self.queue_size = queue_size
+        self.timeout = timeout
+
+        self._executor = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of running and waiting render jobs"""
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, initializer=get_unsigs)
+        return self._executor
+
+    async def run(self, render, *args):
+        """Run render function with given arguments in process pool and return its result"""
+
+        if self._pending >= self.processes + self.queue_size:
+            raise RenderQueueFull(f"{self._pending} render jobs pending")
+
+        loop = asyncio.get_running_loop()
+
+        self._pending += 1
+        try:
+            try:
+                future = self._get_executor().submit(render, *args)
+            except:
+                self._pending -= 1
+                raise
+
+            # a timed out job keeps its worker busy, so its slot is only released when the job has finished
+            future.add_done_callback(lambda _: self._release(loop))
+
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Rendering {render.__name__}{args} timed out")
+            raise
+        except BrokenProcessPool:
+            # replace pool if a worker died, e.g. killed by running out of memory
+            logger.warning("Render process pool broken, restarting pool")
+            self.shutdown()
+            raise
+
+    def _release(self, loop: asyncio.AbstractEventLoop):
+        """Release slot of finished job, called from thread of process pool"""
+        try:
+            loop.call_soon_threadsafe(self._decrement_pending)
+        except RuntimeError:
+            # event loop already closed
+            pass
+
+    def _decrement_pending(self):
+        self._pending -= 1
+
+    def restart(self):
+        """Replace process pool, new workers load current unsigs data; queued jobs finish in old pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def shutdown(self):
+        """Shut down process pool without waiting for running jobs"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Initialize global render service
+render_service = RenderService()
+on_reload(render_service.restart)
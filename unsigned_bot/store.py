@@ -0,0 +1,136 @@
+"""
+Module for the local analytics store
+
+The sales ledger and the current offers hold the records, the store only
+indexes them in an embedded SQLite database by date, unsig number and
+offer type. Rows keep the position of a record in its list, so commands
+query by time window or unsig number with index range scans and get the
+records back without copying or parsing them. The store is in memory
+and rebuilt from the ledger on startup.
+"""
+
+import sqlite3
+from typing import Optional
+
+from unsigned_bot.log import logger
+from unsigned_bot.ledger import SalesLedger
+from unsigned_bot.parsing import get_idx_from_asset_name
+
+
+SCHEMA = """
+CREATE TABLE sales (
+    position INTEGER PRIMARY KEY,
+    number INTEGER,
+    date INTEGER
+);
+CREATE INDEX idx_sales_date ON sales (date);
+CREATE INDEX idx_sales_number ON sales (number, date);
+
+CREATE TABLE offers (
+    position INTEGER PRIMARY KEY,
+    number INTEGER,
+    type TEXT
+);
+CREATE INDEX idx_offers_type ON offers (type);
+"""
+
+
+class AnalyticsStore:
+    """SQLite index with query layer over sales of ledger and current offers"""
+
+    def __init__(self, ledger: SalesLedger):
+        self.ledger = ledger
+        self.offers = list()
+
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.executescript(SCHEMA)
+
+    # === updating ===
+
+    def add_sales(self, sales: list):
+        """Index sales of ledger, reindex known sales with their updated data"""
+
+        rows = [
+            (self.ledger.get_position(sale), get_asset_number(sale), sale.get("date"))
+            for sale in sales
+        ]
+
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO sales VALUES (?, ?, ?)", rows)
+
+    def set_offers(self, offers: list):
+        """Replace all offers with current ones"""
+
+        rows = [
+            (position, get_asset_number(offer), offer.get("type"))
+            for position, offer in enumerate(offers)
+        ]
+
+        with self.connection:
+            self.connection.execute("DELETE FROM offers")
+            self.connection.executemany("INSERT INTO offers VALUES (?, ?, ?)", rows)
+
+        self.offers = offers
+
+    # === queries ===
+
+    def get_sales(self, since: int) -> list:
+        """Return sales after timestamp [in ms] ordered by date"""
+        return self._select_sales("SELECT position FROM sales WHERE date >= ?", [since])
+
+    def get_sales_by_numbers(self, numbers: list, limit: Optional[int] = None) -> list:
+        """Return sales of given unsigs ordered by date, latest first"""
+
+        if not numbers:
+            return list()
+
+        placeholders = ", ".join("?" * len(numbers))
+        query = f"SELECT position FROM sales WHERE number IN ({placeholders})"
+
+        return self._select_sales(query, [int(number) for number in numbers], descending=True, limit=limit)
+
+    def get_sold_numbers(self) -> list:
+        """Return numbers of all unsigs sold at least once"""
+        rows = self.connection.execute("SELECT DISTINCT number FROM sales WHERE number IS NOT NULL")
+        return [number for (number,) in rows]
+
+    def get_offers(self, *types) -> list:
+        """Return current offers of given types"""
+
+        placeholders = ", ".join("?" * len(types))
+        rows = self.connection.execute(f"SELECT position FROM offers WHERE type IN ({placeholders}) ORDER BY position", types)
+
+        return [self.offers[position] for (position,) in rows]
+
+    def get_offer_numbers(self) -> list:
+        """Return numbers of unsigs currently offered"""
+        rows = self.connection.execute("SELECT number FROM offers WHERE number IS NOT NULL")
+        return [number for (number,) in rows]
+
+    def _select_sales(self, query: str, params: list, descending: Optional[bool] = False, limit: Optional[int] = None) -> list:
+        query += " ORDER BY date DESC" if descending else " ORDER BY date"
+
+        if limit:
+            query += " LIMIT ?"
+            params = [*params, limit]
+
+        rows = self.connection.execute(query, params)
+        return [self.ledger.sales[position] for (position,) in rows]
+
+
+def get_asset_number(asset: dict) -> int:
+    """Return unsig number of sale or offer, None if asset name has no number"""
+    try:
+        return get_idx_from_asset_name(asset.get("assetid"))
+    except:
+        return
+
+def load_store(ledger: SalesLedger) -> AnalyticsStore:
+    """Create store and index sales of ledger"""
+
+    store = AnalyticsStore(ledger)
+    store.add_sales(ledger.sales)
+
+    logger.debug(f"Analytics store loaded with {len(ledger)} sales")
+
+    return store
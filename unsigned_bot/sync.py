@@ -0,0 +1,78 @@
+"""
+Module for incremental syncing of sales
+
+For each marketplace the newest known sale (date and id) is persisted
+as high-water mark. Marketplaces return sales ordered newest first,
+so fetching stops at the first page containing an already known sale.
+"""
+
+from typing import Optional
+
+from unsigned_bot import ROOT_DIR
+from unsigned_bot.log import logger
+from unsigned_bot.utility.files_util import load_json, save_json
+
+
+SYNC_STATE_PATH = f"{ROOT_DIR}/data/json/sales_sync.json"
+
+
+def is_newer(sale: dict, mark: Optional[dict]) -> bool:
+    """Check if sale is newer than high-water mark"""
+
+    if not mark:
+        return True
+
+    date = sale.get("date")
+    if date is None:
+        return False
+
+    if date != mark.get("date"):
+        return date > mark.get("date")
+
+    # same date only counts as new for another sale
+    return sale.get("id") != mark.get("id")
+
+def filter_newer_sales(sales: list, mark: Optional[dict]) -> tuple:
+    """
+    Return sales newer than high-water mark
+    and whether a known sale was reached, i.e. fetching can stop.
+    """
+
+    newer = [sale for sale in sales if is_newer(sale, mark)]
+    reached = len(newer) < len(sales)
+
+    return newer, reached
+
+def update_high_water_marks(marks: dict, sales: list) -> dict:
+    """Advance high-water marks of marketplaces to their newest sale"""
+
+    for sale in sales:
+        marketplace = sale.get("marketplace")
+        date = sale.get("date")
+
+        if not marketplace or date is None:
+            continue
+
+        mark = marks.get(marketplace)
+        if not mark or date > mark.get("date"):
+            marks[marketplace] = {
+                "date": date,
+                "id": sale.get("id")
+            }
+
+    return marks
+
+def load_high_water_marks(sales: list, path: Optional[str] = SYNC_STATE_PATH) -> dict:
+    """Load persisted high-water marks, derive them from known sales if missing"""
+
+    try:
+        marks = load_json(path)
+    except:
+        logger.warning("Can not load sync state, derive it from sales")
+        marks = update_high_water_marks(dict(), sales)
+
+    return marks
+
+def save_high_water_marks(marks: dict, path: Optional[str] = SYNC_STATE_PATH):
+    """Persist high-water marks"""
+    save_json(path, marks)
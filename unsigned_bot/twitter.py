@@ -6,10 +6,9 @@ Twitter handle: @unsigned_bot
 import os
 import tweepy
 
-from unsigned_bot import IMAGE_PATH
 from unsigned_bot.log import logger
 from unsigned_bot.parsing import parse_sale, get_unsig_url, get_idx_from_asset_name
-from unsigned_bot.draw import gen_unsig, delete_image_files
+from unsigned_bot.draw import gen_unsig
 from unsigned_bot.emojis import *
 
 from dotenv import load_dotenv
@@ -50,13 +49,11 @@ async def tweet_sales(api: tweepy.API, sales: list):
         tweet_string = f"\n...\n{EMOJI_CART} unsig{str(unsig_number).zfill(5)} SOLD {EMOJI_CART}\n\n{EMOJI_MONEYBAG} {price:,.0f} $ADA\n\n{EMOJI_CALENDAR} {date}\n\n{EMOJI_GEAR} {num_props} properties\n\n#unsigsold #unsig{str(unsig_number).zfill(5)}"
 
         try:
-            filepath_image = await gen_unsig(unsig_number, dim=2048)
+            image_buffer = await gen_unsig(unsig_number, dim=2048)
 
-            media_img = api.media_upload(filename=filepath_image)
+            media_img = api.media_upload(filename=f"unsig{unsig_number}.png", file=image_buffer)
             api.update_status(status=tweet_string, media_ids=[media_img.media_id])
         except:
             tweet_string += f"\n{unsig_url}"
             api.update_status(status=tweet_string)
-        finally:
-            delete_image_files(IMAGE_PATH, suffix="png")
     
\ No newline at end of file
@@ -1,9 +1,12 @@
 """
-Utility functions for handling JSON files
+Utility functions for handling JSON, JSON Lines and numpy array files
 """
 
+import os
 import json
 
+import numpy as np
+
 
 def load_json(path: str):
     """Load json file from given path and return data"""
@@ -17,3 +20,65 @@ def save_json(path: str, data: dict):
     with open(path, "w") as outfile:
         json.dump(data, outfile)
 
+
+def load_jsonl(path: str) -> list:
+    """Load JSON Lines file from given path and return records"""
+
+    records = list()
+    size_valid = 0
+
+    with open(path, "rb") as f:
+        for line in f:
+            # last line is incomplete if an append was interrupted
+            if not line.endswith(b"\n"):
+                break
+
+            records.append(json.loads(line))
+            size_valid += len(line)
+
+    # cut off incomplete line, so next append starts on a new line
+    if size_valid < os.path.getsize(path):
+        os.truncate(path, size_valid)
+
+    return records
+
+def append_jsonl(path: str, records: list):
+    """Append records to JSON Lines file with a single write and flush them to disk"""
+
+    data = "".join(json.dumps(record) + "\n" for record in records)
+
+    with open(path, "a") as outfile:
+        outfile.write(data)
+        outfile.flush()
+        os.fsync(outfile.fileno())
+
+def save_jsonl(path: str, records: list):
+    """Save records as JSON Lines file, replace existing file atomically"""
+
+    path_tmp = f"{path}.tmp"
+
+    with open(path_tmp, "w") as outfile:
+        outfile.write("".join(json.dumps(record) + "\n" for record in records))
+        outfile.flush()
+        os.fsync(outfile.fileno())
+
+    os.replace(path_tmp, path)
+
+
+def save_array(path: str, array: np.ndarray):
+    """Save numpy array to file, replace existing file atomically"""
+
+    path_tmp = f"{path}.tmp"
+
+    with open(path_tmp, "wb") as f:
+        np.save(f, array)
+
+    os.replace(path_tmp, path)
+
+def is_up_to_date(paths: list, source_path: str) -> bool:
+    """Check if all files exist and are not older than the file they were built from"""
+    try:
+        source_time = os.path.getmtime(source_path)
+        return all(os.path.getmtime(path) >= source_time for path in paths)
+    except OSError:
+        return False
@@ -2,6 +2,7 @@
 Utility functions for date and time
 """
 
+import time
 from datetime import datetime
 from dateutil import parser
 
@@ -24,6 +25,10 @@ def get_interval_from_period(period: str) -> int:
     else:
         return 0
 
+def get_timestamp_before(interval_ms: int) -> int:
+    """Return timestamp in milliseconds of given interval before now"""
+    return round(time.time() * 1000) - interval_ms
+
 def datetime_to_timestamp(datetime_str: str) -> int:
     """Parse datetime string and return timestamp in milliseconds"""
     date = parser.parse(datetime_str)